@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from PIL import Image, ImageFont
+
+
+class AssetStore:
+    """新闻图片绘制所需资源 (底图模板与字体) 的预加载仓库
+
+    - 底图模板首次使用时解码一次, 之后每次只返回解码后位图的副本
+    - 字体按 (路径, 字号) 缓存, 每个线程持有自己的一份 (FreeType 字体对象不保证线程安全)
+    - 可缓存由模板派生的预合成底图 (如已绘制好日期的底图), 模板失效时一并清空
+    - 定期检查 assets 目录及已加载文件的修改时间, 文件被替换后自动重新加载, 无需重启
+    """
+
+    def __init__(
+        self, asset_dir: str, check_interval: float = 1.0, max_derived: int = 8
+    ):
+        self.asset_dir = asset_dir
+        self.check_interval = check_interval
+        self.max_derived = max(1, int(max_derived))
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Image.Image] = {}
+        self._derived: "OrderedDict[Tuple[str, Hashable], Image.Image]" = OrderedDict()
+        self._mtimes: Dict[str, int] = {}
+        self._dir_mtime: Optional[int] = None
+        self._last_check = 0.0
+        self._generation = 0
+        self._local = threading.local()
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_reload(self):
+        """资源文件有变化时清空所有缓存 (调用方需持有锁)"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        dir_mtime = self._mtime(self.asset_dir)
+        changed = dir_mtime != self._dir_mtime
+        if not changed:
+            changed = any(
+                self._mtime(path) != mtime for path, mtime in self._mtimes.items()
+            )
+        if changed:
+            self._templates.clear()
+            self._derived.clear()
+            self._mtimes.clear()
+            self._dir_mtime = dir_mtime
+            self._generation += 1
+
+    def _track(self, path: str):
+        self._mtimes[path] = self._mtime(path)
+
+    def template(self, filename: str) -> Optional[Image.Image]:
+        """获取底图模板的可修改副本
+
+        :param filename: assets 目录下的模板文件名, 如 60s_Mon.jpg
+        :return: RGB 图片副本, 文件不存在时返回 None
+        """
+        template = self.shared_template(filename)
+        return template.copy() if template is not None else None
+
+    @property
+    def generation(self) -> int:
+        """资源版本号, 每次重新加载后递增"""
+        return self._generation
+
+    def shared_template(self, filename: str) -> Optional[Image.Image]:
+        """获取共享的已解码模板 (只读, 不可直接在上面绘制)"""
+        path = os.path.join(self.asset_dir, filename)
+        with self._lock:
+            self._check_reload()
+            template = self._templates.get(path)
+            if template is None:
+                if not os.path.exists(path):
+                    return None
+                with Image.open(path) as raw:
+                    template = raw.convert("RGB")
+                template.load()
+                self._templates[path] = template
+                self._track(path)
+        return template
+
+    def derived(
+        self,
+        filename: str,
+        key: Hashable,
+        build: Callable[[Image.Image], Image.Image],
+    ) -> Optional[Image.Image]:
+        """获取由模板派生的共享图片 (只读), 未缓存时调用 build 在模板副本上生成
+
+        :param filename: 模板文件名
+        :param key: 派生图片的标识, 如新闻日期
+        :param build: 接收模板副本并返回派生图片的函数
+        :return: 派生图片, 模板不存在时返回 None
+        """
+        template = self.shared_template(filename)
+        if template is None:
+            return None
+        cache_key = (filename, key)
+        with self._lock:
+            image = self._derived.get(cache_key)
+            if image is not None:
+                self._derived.move_to_end(cache_key)
+                return image
+
+        image = build(template.copy())
+        with self._lock:
+            self._derived[cache_key] = image
+            while len(self._derived) > self.max_derived:
+                self._derived.popitem(last=False)
+        return image
+
+    def font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
+        """获取当前线程复用的字体对象
+
+        :raises IOError: 字体文件无法加载
+        """
+        with self._lock:
+            self._check_reload()
+            generation = self._generation
+            if path not in self._mtimes:
+                self._track(path)
+
+        fonts: Optional[Dict[Tuple[str, int], ImageFont.FreeTypeFont]] = getattr(
+            self._local, "fonts", None
+        )
+        if fonts is None or getattr(self._local, "generation", None) != generation:
+            fonts = {}
+            self._local.fonts = fonts
+            self._local.generation = generation
+
+        font = fonts.get((path, size))
+        if font is None:
+            font = ImageFont.truetype(path, size)
+            fonts[(path, size)] = font
+        return font
+
+    def preload(self, filenames, fonts):
+        """预先加载一组模板与字体 (例如在后台预热时调用)"""
+        for filename in filenames:
+            self.shared_template(filename)
+        for path, size in fonts:
+            self.font(path, size)
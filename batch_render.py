@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .edition_archive import EditionArchive
+from .image_encoder import FORMAT_EXTENSIONS, EncoderSettings
+from .news_image_generator import (
+    ASSET_STORE,
+    DEFAULT_ENCODER,
+    DEFAULT_FONT_PROFILE,
+    FontProfile,
+    load_fonts,
+    render_news_image_timed,
+    render_news_pages_timed,
+)
+
+# 用法 (在插件目录的上一级执行):
+#   python -m astrbot_plugin_daily_news.batch_render news.json --output-dir out
+#   python -m astrbot_plugin_daily_news.batch_render --archive temp/daily_news_archive.db \
+#       --template 60s_Mon.jpg --profiles profiles.json --profile default --profile large
+
+BATCH_LOGGER = "astrbot_plugin_daily_news.batch"
+
+
+@dataclass
+class RenderJob:
+    """一个批量绘制任务: 新闻数据 + 底图 + 字体配置 + 编码参数"""
+
+    job_id: str
+    news_data: Dict[str, Any]
+    template: Optional[str] = None  # 为 None 时按星期选择底图
+    profile: FontProfile = DEFAULT_FONT_PROFILE
+    encoder: EncoderSettings = DEFAULT_ENCODER
+    paginate: bool = False  # 内容过多时分页绘制, 而不是缩小字号
+
+
+@dataclass
+class RenderResult:
+    """一个批量绘制任务的结果"""
+
+    job_id: str
+    image: Optional[bytes]
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    pages: List[bytes] = field(default_factory=list)  # 分页绘制时的每一页 (含第一页)
+
+    @property
+    def ok(self) -> bool:
+        return self.image is not None
+
+
+def render_job(job: RenderJob) -> RenderResult:
+    """执行单个绘制任务
+
+    可在进程池中运行; 同一工作进程内的任务共享已加载的字体、字形宽度缓存与已解码的底图。
+    """
+    logger = logging.getLogger(BATCH_LOGGER)
+    if job.paginate:
+        try:
+            pages, timings = render_news_pages_timed(
+                job.news_data, logger, job.encoder, job.template, job.profile
+            )
+        except Exception as e:
+            return RenderResult(job.job_id, None, error=repr(e))
+        if not pages:
+            return RenderResult(job.job_id, None, timings, error="绘制失败, 详情见日志")
+        return RenderResult(job.job_id, pages[0], timings, pages=pages)
+    try:
+        image, timings = render_news_image_timed(
+            job.news_data, logger, job.encoder, job.template, job.profile
+        )
+    except Exception as e:
+        return RenderResult(job.job_id, None, error=repr(e))
+    if image is None:
+        return RenderResult(job.job_id, None, timings, error="绘制失败, 详情见日志")
+    return RenderResult(job.job_id, image, timings)
+
+
+def warm_worker(profiles: List[FontProfile], templates: List[str]):
+    """工作进程初始化: 预先加载本批任务用到的字体与底图"""
+    for profile in profiles:
+        try:
+            load_fonts(profile=profile)
+        except IOError:
+            # 字体缺失时由具体任务报告错误
+            pass
+    ASSET_STORE.preload(templates, [])
+
+
+def render_batch(
+    jobs: Iterable[RenderJob], max_workers: Optional[int] = None
+) -> Iterator[RenderResult]:
+    """批量绘制, 按完成顺序逐个返回结果
+
+    :param jobs: 绘制任务
+    :param max_workers: 工作进程数, 默认为 CPU 核心数; 为 1 时在当前进程中依次执行
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return
+    if max_workers == 1:
+        for job in jobs:
+            yield render_job(job)
+        return
+
+    profiles = sorted({job.profile for job in jobs}, key=lambda profile: profile.name)
+    templates = sorted({job.template for job in jobs if job.template})
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=warm_worker, initargs=(profiles, templates)
+    )
+    try:
+        futures = [executor.submit(render_job, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # 调用方提前停止迭代时取消尚未开始的任务
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def load_news_inputs(path: str) -> List[Dict[str, Any]]:
+    """读取新闻数据文件
+
+    支持单期新闻数据、API 原始响应 ({"data": ...}) 或它们组成的列表。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    items = payload if isinstance(payload, list) else [payload]
+    return [item.get("data", item) for item in items]
+
+
+def load_profiles(path: Optional[str]) -> Dict[str, FontProfile]:
+    """读取字体配置文件: {"名称": {"news_font": ..., "news_size": ...}, ...}"""
+    profiles = {DEFAULT_FONT_PROFILE.name: DEFAULT_FONT_PROFILE}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for name, options in json.load(f).items():
+                profiles[name] = FontProfile(name=name, **options)
+    return profiles
+
+
+def build_jobs(
+    news_items: List[Dict[str, Any]],
+    templates: List[Optional[str]],
+    profiles: List[FontProfile],
+    encoder: EncoderSettings,
+    paginate: bool = False,
+) -> List[RenderJob]:
+    """为每期新闻生成 底图 x 字体配置 的全部组合"""
+    jobs = []
+    for news_data in news_items:
+        for template in templates:
+            for profile in profiles:
+                template_name = os.path.splitext(template)[0] if template else "auto"
+                job_id = f"{news_data.get('date', 'unknown')}_{template_name}_{profile.name}"
+                jobs.append(
+                    RenderJob(job_id, news_data, template, profile, encoder, paginate)
+                )
+    return jobs
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="批量绘制新闻图片 (补图/多风格)")
+    parser.add_argument("inputs", nargs="*", help="新闻数据 JSON 文件")
+    parser.add_argument("--archive", help="从历史存档数据库读取新闻数据")
+    parser.add_argument("--date", action="append", help="只绘制指定日期 (可重复)")
+    parser.add_argument("--template", action="append", help="底图文件名 (可重复), 默认按星期选择")
+    parser.add_argument("--profiles", help="字体配置 JSON 文件")
+    parser.add_argument("--profile", action="append", help="使用的字体配置名称 (可重复)")
+    parser.add_argument("--workers", type=int, help="工作进程数, 默认为 CPU 核心数")
+    parser.add_argument("--output-dir", default="batch_output", help="输出目录")
+    parser.add_argument("--format", choices=sorted(FORMAT_EXTENSIONS), default="jpeg")
+    parser.add_argument("--quality", type=int, default=88)
+    parser.add_argument("--max-kb", type=int, default=0, help="图片体积上限, 0 表示不限制")
+    parser.add_argument(
+        "--paginate", action="store_true", help="内容过多时分页绘制为多张图片, 而不是缩小字号"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    news_items: List[Dict[str, Any]] = []
+    for path in args.inputs:
+        news_items.extend(load_news_inputs(path))
+    if args.archive:
+        archive = EditionArchive(args.archive)
+        try:
+            for date in args.date or archive.dates(-1):
+                archived = archive.get(date)
+                if archived is None:
+                    print(f"存档中没有 {date} 的新闻")
+                    continue
+                news_items.append(archived.news_data)
+        finally:
+            archive.close()
+    if args.date:
+        news_items = [item for item in news_items if item.get("date") in args.date]
+    if not news_items:
+        parser.error("没有可绘制的新闻数据")
+
+    profiles = load_profiles(args.profiles)
+    try:
+        selected = [profiles[name] for name in args.profile or [DEFAULT_FONT_PROFILE.name]]
+    except KeyError as e:
+        parser.error(f"未知的字体配置: {e.args[0]}")
+    encoder = EncoderSettings.from_config(
+        {"image_format": args.format, "image_quality": args.quality, "image_max_kb": args.max_kb}
+    )
+    jobs = build_jobs(
+        news_items, args.template or [None], selected, encoder, args.paginate
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    failed = 0
+    for index, result in enumerate(render_batch(jobs, args.workers), 1):
+        if result.ok:
+            if len(result.pages) > 1:
+                outputs = [
+                    (f"{result.job_id}_p{number}.{encoder.extension}", data)
+                    for number, data in enumerate(result.pages, 1)
+                ]
+            else:
+                outputs = [(f"{result.job_id}.{encoder.extension}", result.image)]
+            for name, data in outputs:
+                with open(os.path.join(args.output_dir, name), "wb") as f:
+                    f.write(data)
+            total_ms = sum(result.timings.values()) * 1000
+            paths = ", ".join(os.path.join(args.output_dir, name) for name, _ in outputs)
+            print(f"[{index}/{len(jobs)}] {result.job_id}: {total_ms:.0f}ms -> {paths}")
+        else:
+            failed += 1
+            print(f"[{index}/{len(jobs)}] {result.job_id}: 失败 {result.error}")
+    print(f"完成 {len(jobs) - failed}/{len(jobs)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
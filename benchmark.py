@@ -0,0 +1,363 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import datetime
+import statistics
+from typing import Any, Callable, Dict, List, Optional, Tuple
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from PIL import Image, ImageChops, ImageDraw
+from .asset_store import AssetStore
+from .fixtures import SCENARIOS
+from .news_image_generator import (
+    BASE_IMAGE_DIR,
+    MARGIN_X,
+    NEWS_LINE_SPACING,
+    TIP_LINE_SPACING,
+    dated_template,
+    encode_news_image,
+    load_fonts,
+    load_template,
+    render_full_page,
+    render_news_image,
+    resolve_template,
+    wrap_text_pixel,
+)
+from .reference_renderer import reference_fonts, render_reference
+from .reference_renderer import wrap_text_pixel as reference_wrap
+
+# 用法 (在插件目录的上一级执行):
+#   python -m astrbot_plugin_daily_news.benchmark --output bench.json
+#   python -m astrbot_plugin_daily_news.benchmark --baseline bench.json --threshold 0.2
+#   python -m astrbot_plugin_daily_news.benchmark --golden-dir golden --update-golden
+#   python -m astrbot_plugin_daily_news.benchmark --reference --fuzz 3000
+
+STAGES = ("asset_load", "wrap", "draw", "encode", "total")
+
+
+def _current_rss_kb() -> float:
+    """当前进程的常驻内存 (KB), 不支持 /proc 的平台退回到 ru_maxrss"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, IndexError):
+        return _max_rss_kb()
+
+
+def _max_rss_kb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 上 ru_maxrss 的单位是字节, Linux 上是 KB
+    return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+def _peak_rss_kb(func: Callable[[], Any]) -> Optional[float]:
+    """在 fork 出的子进程中执行一次 func, 返回执行期间 RSS 峰值相对执行前的增量 (KB)
+
+    Pillow 的图片缓冲区在 C 层分配, tracemalloc 统计不到, 因此测量整个进程的 RSS。
+    子进程继承已预热的资源, 且峰值记录从 fork 时重新开始 (写时复制的页面也计入, 各次结果之间可比);
+    不支持 fork 的平台返回 None, 此时不做内存回退检查。
+    """
+    if resource is None or not hasattr(os, "fork"):
+        return None
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        code = 0
+        try:
+            before = _current_rss_kb()
+            func()
+            message = f"{max(0.0, _max_rss_kb() - before)}"
+        except BaseException as e:
+            message, code = f"error: {e!r}", 1
+        finally:
+            with os.fdopen(write_fd, "w") as f:
+                f.write(message)
+            os._exit(code)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "r") as f:
+        message = f.read()
+    os.waitpid(pid, 0)
+    if message.startswith("error"):
+        raise RuntimeError(f"测量内存时出错: {message}")
+    return float(message)
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> Dict[str, Optional[float]]:
+    """重复执行 func, 返回耗时中位数/最小值 (毫秒) 与单次执行的 RSS 峰值增量 (KB)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "peak_rss_kb": _peak_rss_kb(func),
+    }
+
+
+def bench_scenario(data: Dict[str, Any], repeat: int, logger) -> Dict[str, Dict[str, float]]:
+    """分阶段测量一个场景的绘制开销"""
+    news_date = datetime.datetime.strptime(data["date"], "%Y-%m-%d")
+    day_of_week = news_date.strftime("%a")
+
+    def asset_load():
+        # 冷加载: 全新的资源仓库, 不复用任何缓存
+        store = AssetStore(BASE_IMAGE_DIR)
+        load_template(day_of_week, logger, store)
+        load_fonts(store)
+
+    # 之后的阶段使用已预热的全局资源仓库
+    fonts = load_fonts()
+    template = load_template(day_of_week, logger)
+    width = template.width
+    max_width = width - 2 * MARGIN_X
+    scratch = ImageDraw.Draw(template.copy())
+    items = [f"{i + 1}. {item.strip()}" for i, item in enumerate(data["news"])]
+    tip = f"【微语】{data.get('tip', '').strip()}"
+
+    def wrap():
+        for item in items:
+            wrap_text_pixel(scratch, item, fonts.news, max_width, NEWS_LINE_SPACING)
+        wrap_text_pixel(scratch, tip, fonts.quote, max_width, TIP_LINE_SPACING)
+
+    filename = resolve_template(day_of_week, logger)
+
+    def draw():
+        # 日期已预合成在共享底图中, 这里只包含复制底图与重绘文本区域
+        background = dated_template(filename, news_date, fonts.date)
+        render_full_page(background, data["news"], data.get("tip", ""), fonts)
+
+    rendered = render_news_image(data, logger, incremental=False)
+
+    def encode():
+        encode_news_image(rendered)
+
+    def total():
+        encode_news_image(render_news_image(data, logger, incremental=False))
+
+    stages = {
+        "asset_load": asset_load,
+        "wrap": wrap,
+        "draw": draw,
+        "encode": encode,
+        "total": total,
+    }
+    return {name: _measure(stages[name], repeat) for name in STAGES}
+
+
+def compare_with_baseline(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """与基线结果比较, 返回超过阈值的回退项"""
+    regressions = []
+    for scenario, stages in results["scenarios"].items():
+        base_stages = baseline.get("scenarios", {}).get(scenario)
+        if not base_stages:
+            continue
+        for stage, metrics in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            for metric in ("median_ms", "peak_rss_kb"):
+                old, new = base.get(metric), metrics.get(metric)
+                if old and new and new > old * (1 + threshold):
+                    increase = (new / old - 1) * 100
+                    regressions.append(
+                        f"{scenario}/{stage}/{metric}: {old:.2f} -> {new:.2f} (+{increase:.1f}%)"
+                    )
+    return regressions
+
+
+def diff_images(name: str, expected: Image.Image, actual: Image.Image) -> Optional[str]:
+    """逐像素比较两张图片, 一致时返回 None"""
+    expected = expected.convert("RGB")
+    if expected.size != actual.size:
+        return f"{name}: 尺寸不一致 {expected.size} != {actual.size}"
+    diff = ImageChops.difference(expected, actual.convert("RGB"))
+    bbox = diff.getbbox()
+    if bbox is None:
+        return None
+    red, green, blue = diff.crop(bbox).split()
+    # 任一通道不为 0 即视为不同的像素
+    changed = sum(ImageChops.lighter(ImageChops.lighter(red, green), blue).histogram()[1:])
+    return f"{name}: {changed} 个像素不同, 区域 {bbox}"
+
+
+def reference_scenarios(logger) -> Dict[str, Tuple[Dict[str, Any], Image.Image]]:
+    """用原始实现绘制各场景; 内容超出 TIP_MAX_Y 的场景会被自动适配有意改变排版, 不参与比较"""
+    references = {}
+    for name, factory in SCENARIOS.items():
+        data = factory()
+        image, overflow = render_reference(data)
+        if image is None:
+            logger.warning(f"[基准测试] 原始实现无法绘制场景 {name}")
+        elif overflow:
+            logger.info(f"[基准测试] 场景 {name} 超出 TIP_MAX_Y, 自动适配后排版不同, 跳过比较")
+        else:
+            references[name] = (data, image)
+    return references
+
+
+def check_golden(golden_dir: str, update: bool, logger) -> List[str]:
+    """与基准图片逐像素比较 (比较编码前的图片, 不受 JPEG 有损压缩影响)
+
+    缺少或指定重新生成的基准图片由原始实现 (reference_renderer) 绘制, 而不是当前实现,
+    因此基准图片始终代表优化前的输出。
+
+    :return: 与基准图片不一致的场景描述
+    """
+    mismatches = []
+    os.makedirs(golden_dir, exist_ok=True)
+    for name, (data, reference) in reference_scenarios(logger).items():
+        golden_path = os.path.join(golden_dir, f"{name}.png")
+        if update or not os.path.exists(golden_path):
+            reference.save(golden_path, format="PNG")
+            logger.info(f"[基准测试] 已用原始实现写入基准图片 {golden_path}")
+        image = render_news_image(data, logger, incremental=False)
+        if image is None:
+            mismatches.append(f"{name}: 绘制失败")
+            continue
+        with Image.open(golden_path) as golden:
+            mismatch = diff_images(name, golden, image)
+        if mismatch:
+            mismatches.append(mismatch)
+    return mismatches
+
+
+def fuzz_text(rng: random.Random) -> str:
+    """随机生成混合中文、拉丁字母、数字、空格、标点、emoji 与换行的文本"""
+    pools = [
+        "中国天气网北方升温模式持续预计将出现大面积高温局地最高气温",
+        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+        "0123456789",
+        "  ",
+        "，。：；“”（）、.-/%",
+        "📉💡✅🌈",
+        "\n",
+    ]
+    weights = [40, 25, 8, 10, 10, 3, 1]
+    length = rng.randint(0, 160)
+    # 较长的无空格拉丁串用于覆盖 textwrap 的强制断词
+    if rng.random() < 0.2:
+        return "".join(rng.choice(pools[1]) for _ in range(length))
+    return "".join(rng.choice(rng.choices(pools, weights)[0]) for _ in range(length))
+
+
+def check_reference(logger, fuzz_cases: int = 3000, seed: int = 0) -> List[str]:
+    """不依赖基准图片, 直接与原始实现比较: 各场景逐像素比较, 换行结果用随机文本比较
+
+    :return: 与原始实现不一致的描述
+    """
+    mismatches = []
+    for name, (data, reference) in reference_scenarios(logger).items():
+        image = render_news_image(data, logger, incremental=False)
+        if image is None:
+            mismatches.append(f"{name}: 绘制失败")
+            continue
+        mismatch = diff_images(name, reference, image)
+        if mismatch:
+            mismatches.append(mismatch)
+
+    rng = random.Random(seed)
+    font_news, _, font_quote = reference_fonts()
+    scratch = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    for case in range(fuzz_cases):
+        text = fuzz_text(rng)
+        font, spacing = rng.choice(
+            [(font_news, NEWS_LINE_SPACING), (font_quote, TIP_LINE_SPACING)]
+        )
+        max_width = rng.choice([1080 - 2 * MARGIN_X, rng.randint(40, 1020)])
+        expected = reference_wrap(scratch, text, font, max_width, spacing)
+        actual = wrap_text_pixel(scratch, text, font, max_width, spacing)
+        if actual != expected:
+            mismatches.append(
+                f"换行 #{case} (宽度 {max_width}, 字号 {font.size}): {text!r} "
+                f"得到 {actual!r}, 原始实现为 {expected!r}"
+            )
+            if len(mismatches) >= 20:
+                break
+    return mismatches
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="新闻图片绘制基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个阶段重复次数")
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS), help="只运行指定场景"
+    )
+    parser.add_argument("--output", help="将结果保存为 JSON")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="允许的回退比例, 默认 20%%")
+    parser.add_argument("--golden-dir", help="基准图片目录, 指定后进行逐像素比较")
+    parser.add_argument(
+        "--update-golden", action="store_true", help="用原始实现重新生成基准图片"
+    )
+    parser.add_argument(
+        "--reference", action="store_true", help="直接与原始实现比较绘制结果与换行结果"
+    )
+    parser.add_argument("--fuzz", type=int, default=3000, help="换行比较的随机文本数量")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logger = logging.getLogger("news_image_benchmark")
+
+    # 预热全局资源仓库与字形缓存, 避免首个场景承担冷启动开销
+    render_news_image(SCENARIOS["example"](), logger)
+
+    results: Dict[str, Any] = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "scenarios": {},
+    }
+    for name in args.scenario or list(SCENARIOS):
+        stages = bench_scenario(SCENARIOS[name](), args.repeat, logger)
+        results["scenarios"][name] = stages
+        print(
+            f"{name:>14}: "
+            + "  ".join(f"{stage}={stages[stage]['median_ms']:.1f}ms" for stage in STAGES)
+            + (
+                f"  peak_rss={stages['total']['peak_rss_kb']:.0f}KB"
+                if stages["total"]["peak_rss_kb"] is not None
+                else ""
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"性能回退: {line}")
+        failed = failed or bool(regressions)
+
+    if args.golden_dir:
+        mismatches = check_golden(args.golden_dir, args.update_golden, logger)
+        for line in mismatches:
+            print(f"输出不一致: {line}")
+        failed = failed or bool(mismatches)
+
+    if args.reference:
+        mismatches = check_reference(logger, args.fuzz)
+        for line in mismatches:
+            print(f"与原始实现不一致: {line}")
+        failed = failed or bool(mismatches)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
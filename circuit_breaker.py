@@ -0,0 +1,90 @@
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态, 调用被直接拒绝"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"服务暂时不可用, 已熔断, {retry_after:.0f} 秒后再试")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """熔断器
+
+    - 连续失败达到阈值后打开, 冷却期内所有调用直接失败, 不再请求已经不可用的服务
+    - 冷却期结束后进入半开状态, 只放行一个试探调用: 成功则关闭, 失败则重新打开
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 120,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if self.clock() - self._opened_at >= self.reset_timeout:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    def retry_after(self) -> float:
+        """距离允许试探调用的剩余秒数"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self._opened_at))
+
+    def before_call(self):
+        """调用前检查, 熔断中时抛出 CircuitOpenError
+
+        :raises CircuitOpenError: 熔断器打开, 或半开状态下已有试探调用在进行
+        """
+        state = self.state
+        if state == STATE_OPEN:
+            raise CircuitOpenError(self.retry_after())
+        if state == STATE_HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(self.reset_timeout)
+            self._probing = True
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        probing, self._probing = self._probing, False
+        if probing or self.failures >= self.failure_threshold:
+            self._opened_at = self.clock()
+
+    async def call(self, func: Callable[[], Awaitable[T]]) -> T:
+        """在熔断器保护下执行异步调用"""
+        self.before_call()
+        try:
+            result = await func()
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # 被取消的调用不计入成败, 但需要释放试探名额
+            self._probing = False
+            raise
+        self.record_success()
+        return result
@@ -4,3 +4,15 @@ import json
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 TEMP_DIR = os.path.join(CURRENT_DIR, os.pardir, os.pardir, "temp")
+
+# 已渲染新闻图片/文本的磁盘缓存目录
+CACHE_DIR = os.path.join(TEMP_DIR, "daily_news_cache")
+
+# 远程新闻图片的下载目录
+DOWNLOAD_DIR = os.path.join(TEMP_DIR, "daily_news_downloads")
+
+# 历史新闻存档数据库
+ARCHIVE_PATH = os.path.join(TEMP_DIR, "daily_news_archive.db")
+
+# 投递日志数据库, 记录每个群组的投递状态, 重启后据此继续投递
+JOURNAL_PATH = os.path.join(TEMP_DIR, "daily_news_delivery.db")
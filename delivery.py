@@ -0,0 +1,236 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+def platform_of(group_id: str) -> str:
+    """从统一会话标识 (如 aiocqhttp:GroupMessage:123) 中解析平台前缀"""
+    return str(group_id).split(":", 1)[0]
+
+
+def parse_rate_overrides(entries: Iterable[str]) -> Dict[str, float]:
+    """解析按平台覆盖的限速配置, 格式为 "平台前缀:每秒条数", 如 "telegram:20" """
+    overrides = {}
+    for entry in entries or []:
+        platform, _, rate = str(entry).rpartition(":")
+        try:
+            overrides[platform.strip()] = float(rate)
+        except ValueError:
+            continue
+    return overrides
+
+
+def percentile(values: List[float], p: float) -> float:
+    """最近秩法计算分位数, 列表为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class TokenBucket:
+    """令牌桶限速器, 发送失败时可暂停一段时间作为退避"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """暂停发放令牌"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+@dataclass
+class DeliveryResult:
+    """单个群组的投递结果"""
+
+    group_id: str
+    ok: bool
+    latency: float  # 从本轮推送开始到该群投递完成的秒数
+    attempts: int
+    error: Optional[str] = None
+    duration: float = 0.0  # 最后一次发送调用本身的耗时
+
+
+@dataclass
+class DeliveryReport:
+    """一轮推送的汇总结果"""
+
+    results: List[DeliveryResult] = field(default_factory=list)
+    duration: float = 0.0
+    timed_out: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)  # 已收到或正在接收这期新闻的群组
+
+    @property
+    def succeeded(self) -> List[DeliveryResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[DeliveryResult]:
+        return [r for r in self.results if not r.ok]
+
+    def latency_percentile(self, p: float) -> float:
+        return percentile([r.latency for r in self.succeeded], p)
+
+    def summary(self) -> str:
+        return (
+            f"成功 {len(self.succeeded)}, 失败 {len(self.failed)}, 超时 {len(self.timed_out)}, "
+            f"跳过 {len(self.skipped)}, "
+            f"耗时 {self.duration:.2f}s, 送达延迟 p50={self.latency_percentile(50):.2f}s "
+            f"p95={self.latency_percentile(95):.2f}s p99={self.latency_percentile(99):.2f}s "
+            f"max={self.latency_percentile(100):.2f}s"
+        )
+
+
+class DeliveryScheduler:
+    """并发向多个群组投递消息
+
+    - 每个平台前缀一个令牌桶, 控制该平台的发送速率
+    - 全局并发上限, 发送失败时对该平台退避后重试
+    - 整轮推送有截止时间 (按群组数与限速估算的时长 + deadline), 超时未完成的群组记为超时
+    """
+
+    def __init__(
+        self,
+        logger,
+        rate_per_platform: float = 3.0,
+        burst: int = 5,
+        concurrency: int = 8,
+        max_retries: int = 2,
+        backoff_base: float = 2.0,
+        deadline: float = 300,
+        rate_overrides: Optional[Dict[str, float]] = None,
+    ):
+        self.logger = logger
+        self.rate_per_platform = rate_per_platform
+        self.burst = burst
+        self.concurrency = max(1, int(concurrency))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.deadline = deadline
+        self.rate_overrides = rate_overrides or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _rate(self, platform: str) -> float:
+        return max(self.rate_overrides.get(platform, self.rate_per_platform), 1e-6)
+
+    def _bucket(self, platform: str) -> TokenBucket:
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            bucket = TokenBucket(self._rate(platform), self.burst)
+            self._buckets[platform] = bucket
+        return bucket
+
+    def estimate_duration(self, group_ids: Iterable[str]) -> float:
+        """按各平台的群组数与限速估算完成投递所需的最短时间 (秒)"""
+        counts = Counter(platform_of(group_id) for group_id in group_ids)
+        return max(
+            (
+                max(0, count - self.burst) / self._rate(platform)
+                for platform, count in counts.items()
+            ),
+            default=0.0,
+        )
+
+    async def _deliver_one(
+        self,
+        group_id: str,
+        send: Callable[[str], Awaitable[None]],
+        semaphore: asyncio.Semaphore,
+        started: float,
+    ) -> DeliveryResult:
+        bucket = self._bucket(platform_of(group_id))
+        error = None
+        attempts = 0
+        while attempts <= self.max_retries:
+            attempts += 1
+            # 先等待本平台的令牌, 避免限速较严的平台占满全局并发
+            await bucket.acquire()
+            send_started = time.monotonic()
+            try:
+                async with semaphore:
+                    send_started = time.monotonic()
+                    await send(group_id)
+                finished = time.monotonic()
+                return DeliveryResult(
+                    group_id,
+                    True,
+                    finished - started,
+                    attempts,
+                    duration=finished - send_started,
+                )
+            except Exception as e:
+                error = str(e)
+                delay = self.backoff_base * 2 ** (attempts - 1)
+                bucket.penalize(delay)
+                self.logger.warning(
+                    f"[每日新闻] 向群组 {group_id} 推送失败 (第 {attempts} 次): {e}"
+                )
+        finished = time.monotonic()
+        return DeliveryResult(
+            group_id,
+            False,
+            finished - started,
+            attempts,
+            error,
+            duration=finished - send_started,
+        )
+
+    async def deliver(
+        self, group_ids: Iterable[str], send: Callable[[str], Awaitable[None]]
+    ) -> DeliveryReport:
+        """向所有群组投递
+
+        :param group_ids: 目标群组的统一会话标识
+        :param send: 向单个群组发送消息的协程函数, 抛出异常视为发送失败;
+            失败后会以同一群组再次调用, 由 send 自行跳过已发出的消息
+        :return: 本轮投递报告
+        """
+        group_ids = list(group_ids)
+        started = time.monotonic()
+        # 群组较多时截止时间随之延长, 限速下正常推送不会被判为超时
+        deadline = self.estimate_duration(group_ids) + self.deadline
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = {
+            asyncio.create_task(self._deliver_one(group_id, send, semaphore, started)): group_id
+            for group_id in group_ids
+        }
+        report = DeliveryReport()
+        if not tasks:
+            return report
+
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+            report.timed_out.append(tasks[task])
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            report.results.append(task.result())
+        report.duration = time.monotonic() - started
+        return report
@@ -0,0 +1,368 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    send_image INTEGER NOT NULL,
+    send_text INTEGER NOT NULL,
+    notice TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    slot TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    job_id TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, group_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_date ON jobs (date);
+"""
+
+# 旧版本数据库缺少的列
+MIGRATIONS = {
+    "jobs": {"slot": "TEXT NOT NULL DEFAULT ''"},
+    "deliveries": {"progress": "INTEGER NOT NULL DEFAULT 0"},
+}
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+STATUS_LABELS = {
+    STATUS_PENDING: "待投递",
+    STATUS_SENDING: "投递中",
+    STATUS_SENT: "已送达",
+    STATUS_FAILED: "失败",
+}
+
+
+def message_parts(send_image: bool, send_text: bool, notice: str = "") -> List[str]:
+    """投递任务按顺序发送的消息, 与 PreparedPayload.parts 的顺序一致"""
+    parts = []
+    if notice:
+        parts.append("notice")
+    if send_image:
+        parts.append("image")
+    if send_text:
+        parts.append("text")
+    return parts
+
+
+def firing_slot(fire_at: float) -> str:
+    """定时推送某一次触发的标识 (UTC 时间), 用于区分同一天的多次推送"""
+    return time.strftime("%Y-%m-%dT%H:%MZ", time.gmtime(fire_at))
+
+
+@dataclass(frozen=True)
+class DeliveryJob:
+    """一次投递任务: 某一期新闻以某种方式 (图片/文本/附加说明) 发送, 定时推送还区分触发时间"""
+
+    job_id: str
+    date: str
+    content_hash: str
+    send_image: bool
+    send_text: bool
+    notice: str = ""
+    created_at: float = 0.0
+    slot: str = ""  # 定时推送的触发标识, 手动推送为空
+
+    @classmethod
+    def for_edition(
+        cls,
+        edition,
+        send_image: bool,
+        send_text: bool,
+        notice: Optional[str] = None,
+        slot: Optional[str] = None,
+    ) -> "DeliveryJob":
+        """同一期新闻以相同方式发送时得到相同的任务, 用于按群组去重
+
+        :param slot: 定时推送的触发标识 (见 firing_slot); 每次触发都是独立的任务,
+            同一天的多个推送时间不会互相去重; 为空时 (手动推送) 同一期新闻只发送一次
+        """
+        parts = [p for p, on in (("image", send_image), ("text", send_text)) if on]
+        mode = "+".join(parts) or "none"
+        if notice:
+            digest = hashlib.sha256(notice.encode("utf-8")).hexdigest()[:8]
+            mode += f"+notice-{digest}"
+        job_id = f"{edition.date}/{edition.content_hash}/{mode}"
+        if slot:
+            job_id += f"@{slot}"
+        return cls(
+            job_id=job_id,
+            date=edition.date,
+            content_hash=edition.content_hash,
+            send_image=send_image,
+            send_text=send_text,
+            notice=notice or "",
+            created_at=time.time(),
+            slot=slot or "",
+        )
+
+
+@dataclass
+class GroupDelivery:
+    """某个群组在某次投递任务中的状态"""
+
+    job_id: str
+    group_id: str
+    status: str
+    attempts: int
+    error: str
+    updated_at: float
+
+
+class DeliveryJournal:
+    """持久化的投递日志 (SQLite), 记录每个群组的投递状态
+
+    - 投递前先认领群组 (状态置为 sending), 已送达或正在由其他调用投递的群组会被跳过
+    - 进程在投递中途退出时, 重启后将 sending 恢复为 pending 并继续投递
+    - 失败的群组在达到最大尝试次数之前可以再次认领重试
+    - 记录每个群组已发出的消息条数, 重试或恢复时只发送尚未发出的部分
+    所有方法都是同步的, 在事件循环中请通过 ``asyncio.to_thread`` 调用。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = 3,
+        resume_max_age: float = 6 * 3600,
+        retention_days: int = 7,
+        logger=None,
+    ):
+        self.path = os.path.abspath(path)
+        self.max_attempts = max(1, int(max_attempts))
+        self.resume_max_age = resume_max_age
+        self.retention = max(1, int(retention_days)) * 86400
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库 (调用方需持有锁)"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        for table, columns in MIGRATIONS.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def claim(self, job: DeliveryJob, groups: Iterable[str]) -> List[str]:
+        """登记投递任务并认领需要发送的群组
+
+        已送达、正在投递或已达到最大尝试次数的群组不会被认领。
+
+        :return: 本次需要发送的群组, 保持传入的顺序
+        """
+        groups = list(dict.fromkeys(groups))
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO jobs (job_id, date, content_hash, send_image, "
+                    "send_text, notice, created_at, slot) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job.job_id,
+                        job.date,
+                        job.content_hash,
+                        int(job.send_image),
+                        int(job.send_text),
+                        job.notice,
+                        job.created_at or now,
+                        job.slot,
+                    ),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO deliveries (job_id, group_id, status, attempts, "
+                    "error, updated_at) VALUES (?, ?, ?, 0, '', ?)",
+                    [(job.job_id, group_id, STATUS_PENDING, now) for group_id in groups],
+                )
+                rows = conn.execute(
+                    "SELECT group_id FROM deliveries WHERE job_id = ? "
+                    "AND status IN (?, ?) AND attempts < ?",
+                    (job.job_id, STATUS_PENDING, STATUS_FAILED, self.max_attempts),
+                ).fetchall()
+                claimable = {row[0] for row in rows}
+                claimed = [group_id for group_id in groups if group_id in claimable]
+                # 认领时即计入尝试次数, 避免投递中途反复崩溃导致无限重试
+                conn.executemany(
+                    "UPDATE deliveries SET status = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE job_id = ? AND group_id = ?",
+                    [(STATUS_SENDING, now, job.job_id, group_id) for group_id in claimed],
+                )
+        return claimed
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        """各群组在该任务中已发出的消息条数 (只包含已发出部分消息的群组)"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT group_id, progress FROM deliveries WHERE job_id = ? AND progress > 0",
+                (job_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def mark_progress(self, job_id: str, group_id: str, sent: int):
+        """记录群组已发出的消息条数"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "UPDATE deliveries SET progress = ?, updated_at = ? "
+                    "WHERE job_id = ? AND group_id = ?",
+                    (sent, time.time(), job_id, group_id),
+                )
+
+    def delivered_parts(self, date: str, content_hash: str, group_id: str) -> Set[str]:
+        """群组已收到的某期新闻的消息 (image/text), 统计该期新闻的所有投递任务 (定时与手动)
+
+        已送达的任务计入全部消息, 中途中断的任务计入已发出的部分; 附加说明不计入。
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT j.send_image, j.send_text, j.notice, d.status, d.progress "
+                "FROM deliveries d JOIN jobs j ON d.job_id = j.job_id "
+                "WHERE j.date = ? AND j.content_hash = ? AND d.group_id = ? "
+                "AND (d.status = ? OR d.progress > 0)",
+                (date, content_hash, group_id, STATUS_SENT),
+            ).fetchall()
+        delivered: Set[str] = set()
+        for send_image, send_text, notice, status, progress in rows:
+            parts = message_parts(bool(send_image), bool(send_text), notice)
+            delivered.update(parts if status == STATUS_SENT else parts[:progress])
+        delivered.discard("notice")
+        return delivered
+
+    def mark_sent(self, job_id: str, group_id: str):
+        self._mark(job_id, group_id, STATUS_SENT, "")
+
+    def mark_failed(self, job_id: str, group_id: str, error: str):
+        self._mark(job_id, group_id, STATUS_FAILED, error)
+
+    def _mark(self, job_id: str, group_id: str, status: str, error: str):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "UPDATE deliveries SET status = ?, error = ?, updated_at = ? "
+                    "WHERE job_id = ? AND group_id = ?",
+                    (status, error, time.time(), job_id, group_id),
+                )
+
+    def retryable(self, job_id: str) -> List[GroupDelivery]:
+        """投递失败且尚未达到最大尝试次数的群组"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT job_id, group_id, status, attempts, error, updated_at "
+                "FROM deliveries WHERE job_id = ? AND status IN (?, ?) AND attempts < ?",
+                (job_id, STATUS_PENDING, STATUS_FAILED, self.max_attempts),
+            ).fetchall()
+        return [GroupDelivery(*row) for row in rows]
+
+    def recover(self) -> List[DeliveryJob]:
+        """启动时恢复上次未完成的投递
+
+        上次进程退出时仍处于 sending 的群组无法确认是否送达, 恢复为 pending 重新投递
+        (宁可重复也不漏发); 同时清理超过保留期的记录。
+
+        :return: 仍有群组待投递且未超过 resume_max_age 的任务
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "UPDATE deliveries SET status = ? WHERE status = ?",
+                    (STATUS_PENDING, STATUS_SENDING),
+                )
+                expired = now - self.retention
+                conn.execute(
+                    "DELETE FROM deliveries WHERE job_id IN "
+                    "(SELECT job_id FROM jobs WHERE created_at < ?)",
+                    (expired,),
+                )
+                conn.execute("DELETE FROM jobs WHERE created_at < ?", (expired,))
+            rows = conn.execute(
+                "SELECT job_id, date, content_hash, send_image, send_text, notice, created_at, slot "
+                "FROM jobs WHERE created_at >= ? AND job_id IN "
+                "(SELECT job_id FROM deliveries WHERE status IN (?, ?) AND attempts < ?) "
+                "ORDER BY created_at",
+                (now - self.resume_max_age, STATUS_PENDING, STATUS_FAILED, self.max_attempts),
+            ).fetchall()
+        return [
+            DeliveryJob(
+                row[0], row[1], row[2], bool(row[3]), bool(row[4]), row[5], row[6], row[7]
+            )
+            for row in rows
+        ]
+
+    def groups(self, job_id: str) -> List[str]:
+        """投递任务登记的全部群组"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT group_id FROM deliveries WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def status(self, date: Optional[str] = None) -> List[GroupDelivery]:
+        """查询某一天 (默认最近一天) 所有投递任务的群组状态"""
+        with self._lock:
+            conn = self._connect()
+            if date is None:
+                row = conn.execute("SELECT MAX(date) FROM jobs").fetchone()
+                date = row[0] if row else None
+                if date is None:
+                    return []
+            rows = conn.execute(
+                "SELECT d.job_id, d.group_id, d.status, d.attempts, d.error, d.updated_at "
+                "FROM deliveries d JOIN jobs j ON d.job_id = j.job_id "
+                "WHERE j.date = ? ORDER BY j.created_at, d.group_id",
+                (date,),
+            ).fetchall()
+        return [GroupDelivery(*row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+
+def format_status(rows: List[GroupDelivery]) -> str:
+    """将投递状态整理为按任务分组的文本"""
+    lines = []
+    job_id = None
+    for row in rows:
+        if row.job_id != job_id:
+            job_id = row.job_id
+            if lines:
+                lines.append("")
+            lines.append(f"{job_id}:")
+        error = f", {row.error[:60]}" if row.error and row.status != STATUS_SENT else ""
+        label = STATUS_LABELS.get(row.status, row.status)
+        lines.append(f"  {row.group_id}: {label} (尝试 {row.attempts} 次{error})")
+    return "\n".join(lines)
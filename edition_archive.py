@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS editions (
+    date TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    raw_json TEXT NOT NULL,
+    text TEXT NOT NULL,
+    image BLOB NOT NULL,
+    image_ext TEXT NOT NULL,
+    archived_at REAL NOT NULL,
+    PRIMARY KEY (date, variant)
+);
+"""
+
+
+@dataclass
+class ArchivedEdition:
+    """存档中的一期新闻"""
+
+    date: str
+    variant: str
+    content_hash: str
+    news_data: Dict[str, Any]
+    text: str
+    image: bytes
+    image_ext: str
+    archived_at: float
+
+
+class EditionArchive:
+    """历史新闻存档 (SQLite, 按日期索引)
+
+    保存每期新闻的原始 API 数据、生成好的图片与文本, 查询历史新闻无需请求 API。
+    只保留最近 retention 期, 删除旧数据后压缩数据库文件以回收磁盘空间。
+    所有方法都是同步的, 在事件循环中请通过 ``asyncio.to_thread`` 调用。
+    """
+
+    def __init__(self, path: str, retention: int = 30, logger=None):
+        self.path = os.path.abspath(path)
+        self.retention = max(1, int(retention))
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库 (调用方需持有锁)"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def store(
+        self,
+        news_data: Dict[str, Any],
+        variant: str,
+        content_hash: str,
+        text: str,
+        image: bytes,
+        image_ext: str = "jpg",
+    ):
+        """存档一期新闻, 同一日期同一变体只保留最新的一份, 并按保留期数清理"""
+        row = (
+            str(news_data.get("date", "")),
+            variant,
+            content_hash,
+            json.dumps(news_data, ensure_ascii=False),
+            text,
+            sqlite3.Binary(image),
+            image_ext,
+            time.time(),
+        )
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO editions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row
+                )
+            removed = self._prune(conn)
+        if removed and self.logger:
+            self.logger.info(f"[每日新闻] 已从存档中清理 {removed} 条过期新闻")
+
+    def get(self, date: str, variant: Optional[str] = None) -> Optional[ArchivedEdition]:
+        """查询某一天的新闻, 优先返回指定变体, 否则返回最近存档的一份"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT date, variant, content_hash, raw_json, text, image, image_ext, archived_at "
+                "FROM editions WHERE date = ? "
+                "ORDER BY variant = ? DESC, archived_at DESC LIMIT 1",
+                (date, variant or ""),
+            ).fetchone()
+        if row is None:
+            return None
+        return ArchivedEdition(
+            date=row[0],
+            variant=row[1],
+            content_hash=row[2],
+            news_data=json.loads(row[3]),
+            text=row[4],
+            image=bytes(row[5]),
+            image_ext=row[6],
+            archived_at=row[7],
+        )
+
+    def dates(self, limit: int = 10) -> List[str]:
+        """最近存档的日期, 从新到旧, limit 为负数时返回全部"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT DISTINCT date FROM editions ORDER BY date DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def _prune(self, conn: sqlite3.Connection) -> int:
+        """只保留最近 retention 个日期, 有删除时压缩数据库 (调用方需持有锁)"""
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM editions WHERE date NOT IN "
+                "(SELECT DISTINCT date FROM editions ORDER BY date DESC LIMIT ?)",
+                (self.retention,),
+            )
+        removed = cursor.rowcount
+        if removed > 0:
+            self._compact(conn)
+        return removed
+
+    def compact(self):
+        """压缩数据库文件, 回收已删除数据占用的空间"""
+        with self._lock:
+            self._compact(self._connect())
+
+    @staticmethod
+    def _compact(conn: sqlite3.Connection):
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,127 @@
+import sys
+import copy
+import asyncio
+import argparse
+import datetime
+from typing import Any, Dict, Optional, Tuple
+from aiohttp import web
+from .fixtures import EXAMPLE_API_DATA
+
+# 本地新闻源模拟服务, 用于离线调试多新闻源的获取、合并与容错
+# 用法 (在插件目录的上一级执行):
+#   python -m astrbot_plugin_daily_news.fixture_server --port 8765
+# 然后在 news_sources 中填写如 "fast|http://127.0.0.1:8765/ok"、"slow|http://127.0.0.1:8765/slow?delay=3"
+#
+# 路径:
+#   /ok        当天的示例新闻 (包在 {"data": ...} 中)
+#   /plain     当天的示例新闻 (直接返回, 不包装)
+#   /variant   与示例新闻大部分重复、措辞略有不同, 另有几条独有的新闻
+#   /stale     前一天的新闻
+#   /slow      延迟 delay 秒 (默认 3) 后返回当天新闻
+#   /error     返回 status 状态码 (默认 503)
+#   /invalid   返回无法解析的 JSON
+#   /empty     新闻列表为空
+# 所有路径都支持 ?date=YYYY-MM-DD 指定新闻日期, /flaky?every=N 每 N 次请求失败一次
+
+VARIANT_EXTRA = [
+    "国家统计局：4月份全国居民消费价格同比下降0.1%，核心CPI同比上涨0.5%",
+    "国内油价或迎年内第四次上调，加满一箱油将多花约5元",
+    "世卫组织：全球麻疹病例持续上升，呼吁加强疫苗接种",
+]
+
+
+def fixture_news(date: str, variant: bool = False) -> Dict[str, Any]:
+    data = copy.deepcopy(EXAMPLE_API_DATA)
+    data["date"] = date
+    if variant:
+        # 改写部分条目的标点与措辞, 模拟其他来源对同一新闻的表述
+        data["news"] = [
+            item.replace("：", ":").replace("，", ", ") + ("。" if i % 2 else "")
+            for i, item in enumerate(data["news"][:10])
+        ] + VARIANT_EXTRA
+        data["tip"] = ""
+    return data
+
+
+def create_app() -> web.Application:
+    counters: Dict[str, int] = {}
+
+    def request_date(request: web.Request, days_ago: int = 0) -> str:
+        date = request.query.get("date")
+        if date:
+            return date
+        return (datetime.date.today() - datetime.timedelta(days=days_ago)).isoformat()
+
+    async def ok(request: web.Request) -> web.Response:
+        return web.json_response({"data": fixture_news(request_date(request))})
+
+    async def plain(request: web.Request) -> web.Response:
+        return web.json_response(fixture_news(request_date(request)))
+
+    async def variant(request: web.Request) -> web.Response:
+        return web.json_response({"data": fixture_news(request_date(request), True)})
+
+    async def stale(request: web.Request) -> web.Response:
+        return web.json_response({"data": fixture_news(request_date(request, 1))})
+
+    async def slow(request: web.Request) -> web.Response:
+        await asyncio.sleep(float(request.query.get("delay", 3)))
+        return web.json_response({"data": fixture_news(request_date(request))})
+
+    async def error(request: web.Request) -> web.Response:
+        return web.Response(status=int(request.query.get("status", 503)), text="error")
+
+    async def invalid(request: web.Request) -> web.Response:
+        return web.Response(text="{not json", content_type="application/json")
+
+    async def empty(request: web.Request) -> web.Response:
+        data = fixture_news(request_date(request))
+        data["news"] = []
+        return web.json_response({"data": data})
+
+    async def flaky(request: web.Request) -> web.Response:
+        every = max(1, int(request.query.get("every", 2)))
+        counters["flaky"] = counters.get("flaky", 0) + 1
+        if counters["flaky"] % every == 0:
+            return web.Response(status=503, text="flaky")
+        return web.json_response({"data": fixture_news(request_date(request))})
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    app.router.add_get("/plain", plain)
+    app.router.add_get("/variant", variant)
+    app.router.add_get("/stale", stale)
+    app.router.add_get("/slow", slow)
+    app.router.add_get("/error", error)
+    app.router.add_get("/invalid", invalid)
+    app.router.add_get("/empty", empty)
+    app.router.add_get("/flaky", flaky)
+    return app
+
+
+async def start_fixture_server(
+    host: str = "127.0.0.1", port: int = 0
+) -> Tuple[web.AppRunner, str]:
+    """在当前事件循环中启动模拟服务, port 为 0 时自动分配端口
+
+    :return: (runner, 服务根地址); 用完后调用 ``await runner.cleanup()``
+    """
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def run(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="本地新闻源模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    web.run_app(create_app(), host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
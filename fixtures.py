@@ -0,0 +1,70 @@
+# 新闻图片绘制的示例数据与极端场景数据, 供本地调试与基准测试使用
+
+import copy
+from typing import Any, Dict
+
+EXAMPLE_API_DATA = {
+    "date": "2025-05-13",
+    "news": [
+        "中国天气网：北方升温模式持续，预计16日起将出现大面积高温天气，局地最高气温或达40°C",
+        "西藏拉孜12日发生5.5级地震：震感明显，无人员伤亡；腾讯宣布：微信、QQ地震预警功能正式覆盖至全国，iOS待解锁",
+        "教育部基础教育教指委：小学阶段禁止学生独自使用开放式内容生成功能",
+        "国内首例侵入式脑机接口系统前瞻性临床试验：受试者已能用意念玩赛车游戏，产品预计2028年上市",
+        "江西吉水县一00后自愿入伍后拒服兵役，官方通报：不得考公，两年内经商、升学等受限",
+        "民企老板被错羁212天：申请国赔千万余元，要求恢复名誉赔礼道歉",
+        "湖南长沙县一出租房疑存非法代孕手术室实验室？官方通报：查封涉事场所，相关人员被控制",
+        "沈阳一超市疑借领养名义烹食流浪狗，市监局回应：已收到多起投诉",
+        "台媒：台当局将96%汉人改成“其余人口”，被痛批干脆改成火星来的",
+        "中美日内瓦经贸会谈联合声明发布：双方同意相互取消91%的关税，暂停90天24%关税，并继续协商解决彼此关切",
+        "美媒：特朗普将签署行政令，强制执行“最惠国”药价令，美国药价或将狂降30%至80%",
+        "美媒：特朗普拟接受卡塔尔赠送豪华飞机，替换40年机龄的空军一号，价值4亿美元或为该国史上最贵礼物，白宫前顾问称收外国所赠专机或违宪",
+        "西媒：西班牙一城市工厂发生火灾致有毒气体氯气泄漏，当局要求受影响的5个城市超过16万居民居家 “隔离”",
+        "英媒：英国首相宣布永久居留权的最低居住年限将从5年延长至10年；英国首相住所起火，无人伤亡，警方紧急调查情况",
+        "外媒：库尔德工人党宣布解散并结束武装活动，土耳其40年内乱结束；泽连斯基称将前往土耳其与普京会面，乌克兰已做好与俄会谈准备",
+    ],
+    "tip": "现实和理想之间，不变的是跋涉，暗淡与辉煌之间，不变的是开拓。这是一个比较长的例子，用来测试换行和是否会超出边界。",
+}
+
+
+def many_items_data(count: int = 30) -> Dict[str, Any]:
+    """新闻条目数远超一页的情况"""
+    data = copy.deepcopy(EXAMPLE_API_DATA)
+    items = EXAMPLE_API_DATA["news"]
+    data["news"] = [items[i % len(items)] for i in range(count)]
+    return data
+
+
+def long_latin_tokens_data() -> Dict[str, Any]:
+    """含超长无空格英文单词/URL 的情况, 触发预切分与单词截断"""
+    data = copy.deepcopy(EXAMPLE_API_DATA)
+    data["news"] = [
+        "OpenAI发布新模型：" + "Supercalifragilisticexpialidocious" * 4,
+        "详情见 https://example.com/" + "a1b2c3d4e5" * 20 + "/index.html",
+        "Pneumonoultramicroscopicsilicovolcanoconiosis and "
+        "Antidisestablishmentarianism are both very long English words",
+        " ".join(["internationalization"] * 12),
+    ] + EXAMPLE_API_DATA["news"][:6]
+    return data
+
+
+def mixed_scripts_data() -> Dict[str, Any]:
+    """emoji 与多种文字混排的情况"""
+    data = copy.deepcopy(EXAMPLE_API_DATA)
+    data["news"] = [
+        "🚀 SpaceX 星舰第十次试飞成功 🎉🎉🎉，马斯克：下一步登陆火星 🔴",
+        "日本の首相が記者会見：経済対策を発表、円安が進む 📉",
+        "한국 대통령, 새로운 경제 정책 발표 — 반도체 산업 지원 강화 💡",
+        "Ελληνικά, Русский текст и العربية نص مختلط с 中文内容 ✅",
+        "数学符号：∑∫∂√∞≈≠≤≥ 与全角字符 ＡＢＣ１２３ 混排测试",
+    ] + EXAMPLE_API_DATA["news"][:8]
+    data["tip"] = "🌈 " + EXAMPLE_API_DATA["tip"] + " ✨"
+    return data
+
+
+# 基准测试使用的全部场景
+SCENARIOS = {
+    "example": lambda: copy.deepcopy(EXAMPLE_API_DATA),
+    "many_items": many_items_data,
+    "long_latin": long_latin_tokens_data,
+    "mixed_scripts": mixed_scripts_data,
+}
@@ -0,0 +1,160 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import aiohttp
+
+# 这些状态码视为暂时性错误, 会进行重试
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class HttpStatusError(Exception):
+    """HTTP 请求返回了非预期的状态码"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class ConditionalEntry:
+    """条件请求所需的校验信息以及上次解析好的响应"""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    payload: Any
+
+
+class HttpClient:
+    """插件生命周期内共享的 HTTP 客户端
+
+    - 复用同一个 ClientSession 与连接池 (keep-alive, DNS 缓存)
+    - 每个请求都有超时, 暂时性错误按带抖动的指数退避重试
+    - 支持 ETag / If-Modified-Since 条件请求, 304 时直接返回上次解析的结果
+    """
+
+    def __init__(
+        self,
+        logger,
+        user_agent: str,
+        timeout: float = 15,
+        connect_timeout: float = 5,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8,
+        pool_limit: int = 20,
+    ):
+        self.logger = logger
+        self.user_agent = user_agent
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_limit = pool_limit
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._conditional: Dict[str, ConditionalEntry] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit, ttl_dns_cache=300, keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"User-Agent": self.user_agent},
+            )
+        return self._session
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 在 [0, base * 2^attempt] 之间随机等待
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def _with_retry(
+        self, url: str, action: Callable[[aiohttp.ClientSession], Awaitable[Any]]
+    ) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await action(self._get_session())
+            except HttpStatusError as e:
+                if e.status not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    raise
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+            delay = self._backoff(attempt)
+            attempt += 1
+            self.logger.warning(
+                f"[每日新闻] 请求 {url} 失败: {error!r}, {delay:.2f} 秒后第 {attempt} 次重试"
+            )
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, conditional: bool = True) -> Tuple[Any, bool]:
+        """GET 并解析 JSON
+
+        :param url: 请求地址
+        :param conditional: 是否携带 ETag / If-Modified-Since 发起条件请求
+        :return: (解析后的数据, 是否为 304 未修改)
+        """
+        entry = self._conditional.get(url) if conditional else None
+
+        async def action(session: aiohttp.ClientSession):
+            headers = {}
+            if entry is not None:
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    return entry.payload, True
+                if response.status != 200:
+                    raise HttpStatusError(
+                        response.status, f"API返回错误代码: {response.status}"
+                    )
+                payload = await response.json(content_type=None)
+                if conditional:
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if etag or last_modified:
+                        self._conditional[url] = ConditionalEntry(
+                            etag=etag, last_modified=last_modified, payload=payload
+                        )
+                return payload, False
+
+        return await self._with_retry(url, action)
+
+    async def stream(
+        self,
+        url: str,
+        handle: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """GET 并交由 handle 流式处理响应 (状态码由 handle 自行检查)
+
+        handle 抛出 HttpStatusError 或网络错误时整个请求会按退避策略重试。
+
+        :param timeout: 本次请求的总超时 (秒), 连接超时仍沿用会话设置; 默认沿用会话的超时
+        """
+        # 未指定时不传 timeout: 传入 None 会关闭包括连接超时在内的所有超时
+        options: Dict[str, Any] = {}
+        if timeout:
+            options["timeout"] = aiohttp.ClientTimeout(
+                total=timeout, connect=self.timeout.connect
+            )
+
+        async def action(session: aiohttp.ClientSession):
+            async with session.get(url, headers=headers or {}, **options) as response:
+                return await handle(response)
+
+        return await self._with_retry(url, action)
+
+    async def close(self):
+        """关闭会话与连接池"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
@@ -0,0 +1,183 @@
+import os
+import hashlib
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+import aiohttp
+from .http_client import HttpClient, HttpStatusError
+from .single_flight import SingleFlight
+
+# 图片文件头特征, 用于在下载过程中校验内容确实是图片
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+HEADER_BYTES = 12
+
+# 部分图床不返回具体的图片类型, 这些类型交由文件头校验
+GENERIC_CONTENT_TYPES = {"application/octet-stream", "binary/octet-stream"}
+
+
+def sniff_image(header: bytes) -> Optional[str]:
+    """根据文件头判断图片格式
+
+    :return: 图片扩展名 (jpg/png/gif/webp), 无法识别时返回 None
+    """
+    for signature, ext in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return ext
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+class DownloadError(Exception):
+    """下载内容不符合要求 (过大 / 类型错误 / 不是图片), 不会重试"""
+
+
+@dataclass
+class DownloadedImage:
+    """已下载到本地的图片文件"""
+
+    url: str
+    path: str
+    size: int
+    format: str  # 文件扩展名
+    etag: Optional[str] = None
+    reused: bool = False  # 是否复用了之前下载的文件
+
+
+class ImageDownloader:
+    """将远程图片流式下载到 TEMP_DIR 下的文件
+
+    - 分块写入临时文件, 不在内存中保留完整图片
+    - 限制最大体积, 校验 Content-Type 与图片文件头, 不符合时立即中止
+    - 按 URL 记录 ETag, 再次下载时发起条件请求, 304 或 ETag 相同则直接复用文件
+    - 同一 URL 的并发下载合并为一次
+    """
+
+    def __init__(
+        self,
+        http: HttpClient,
+        download_dir: str,
+        max_bytes: int = 10 * 1024 * 1024,
+        timeout: float = 30,
+        max_files: int = 8,
+        chunk_size: int = 64 * 1024,
+        logger=None,
+    ):
+        self.http = http
+        self.download_dir = os.path.abspath(download_dir)
+        self.max_bytes = max(1, int(max_bytes))
+        self.timeout = timeout
+        self.max_files = max(1, int(max_files))
+        self.chunk_size = chunk_size
+        self.logger = logger
+        self._entries: Dict[str, DownloadedImage] = {}
+        self._flights = SingleFlight()
+
+    def _stem(self, url: str) -> str:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.download_dir, name)
+
+    async def fetch(self, url: str) -> DownloadedImage:
+        """下载图片, 同一 URL 已在下载时等待其结果
+
+        :raises DownloadError: 内容不符合要求
+        :raises HttpStatusError: 重试后仍返回错误状态码
+        """
+        return await self._flights.run(url, lambda: self._fetch(url))
+
+    async def _fetch(self, url: str) -> DownloadedImage:
+        entry = self._entries.get(url)
+        if entry is not None and not os.path.isfile(entry.path):
+            entry = None
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else {}
+
+        async def handle(response: aiohttp.ClientResponse) -> DownloadedImage:
+            if response.status == 304 and entry is not None:
+                return replace(entry, reused=True)
+            if response.status != 200:
+                raise HttpStatusError(
+                    response.status, f"下载图片失败，状态码: {response.status}"
+                )
+            etag = response.headers.get("ETag")
+            if entry is not None and etag and etag == entry.etag:
+                return replace(entry, reused=True)
+            self._check_headers(response)
+            return await self._write(url, response, etag)
+
+        result = await self.http.stream(url, handle, headers=headers, timeout=self.timeout)
+        if not result.reused:
+            self._entries[url] = result
+            self._prune()
+        return result
+
+    def _check_headers(self, response: aiohttp.ClientResponse):
+        content_type = response.headers.get("Content-Type", "")
+        mime = content_type.split(";")[0].strip().lower()
+        if mime and not mime.startswith("image/") and mime not in GENERIC_CONTENT_TYPES:
+            raise DownloadError(f"下载内容不是图片: {content_type}")
+        length = response.content_length
+        if length is not None and length > self.max_bytes:
+            raise DownloadError(f"图片过大: {length} > {self.max_bytes} 字节")
+
+    async def _write(
+        self, url: str, response: aiohttp.ClientResponse, etag: Optional[str]
+    ) -> DownloadedImage:
+        """分块写入临时文件, 校验通过后再替换为正式文件"""
+        os.makedirs(self.download_dir, exist_ok=True)
+        stem = self._stem(url)
+        part_path = f"{stem}.part"
+        size = 0
+        header = b""
+        image_format = None
+        try:
+            with open(part_path, "wb") as f:
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise DownloadError(f"图片超过大小上限 {self.max_bytes} 字节")
+                    if image_format is None and len(header) < HEADER_BYTES:
+                        header += chunk[: HEADER_BYTES - len(header)]
+                        if len(header) >= HEADER_BYTES:
+                            image_format = self._sniff(header)
+                    f.write(chunk)
+            if image_format is None:
+                image_format = self._sniff(header)
+            path = f"{stem}.{image_format}"
+            os.replace(part_path, path)
+        except BaseException:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            raise
+        return DownloadedImage(
+            url=url, path=path, size=size, format=image_format, etag=etag
+        )
+
+    @staticmethod
+    def _sniff(header: bytes) -> str:
+        image_format = sniff_image(header)
+        if image_format is None:
+            raise DownloadError(f"下载内容不是可识别的图片 (文件头: {header[:8].hex()})")
+        return image_format
+
+    def _prune(self):
+        """下载目录只保留最近的 max_files 个文件"""
+        try:
+            paths = [
+                os.path.join(self.download_dir, name)
+                for name in os.listdir(self.download_dir)
+                if not name.endswith(".part")
+            ]
+            if len(paths) <= self.max_files:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[: len(paths) - self.max_files]:
+                os.remove(path)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"[每日新闻] 清理下载目录失败: {e}")
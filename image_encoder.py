@@ -0,0 +1,165 @@
+import threading
+from io import BytesIO
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    # 只用于类型标注; 编码参数在插件启动时就会被读取, 不在此时导入 Pillow
+    from PIL import Image
+
+FORMAT_JPEG = "jpeg"
+FORMAT_WEBP = "webp"
+FORMAT_PNG = "png"  # 调色板 PNG
+
+FORMAT_EXTENSIONS = {FORMAT_JPEG: "jpg", FORMAT_WEBP: "webp", FORMAT_PNG: "png"}
+SUBSAMPLING_OPTIONS = ("4:4:4", "4:2:2", "4:2:0")
+
+# 调色板 PNG 没有质量参数, 以颜色数作为 "质量" 档位
+PNG_PALETTE_STEPS = (256, 128, 64, 32, 16)
+
+
+@dataclass(frozen=True)
+class EncoderSettings:
+    """新闻图片的编码参数 (可在进程池间传递)"""
+
+    format: str = FORMAT_JPEG
+    quality: int = 88  # 初始 (最高) 质量
+    min_quality: int = 40  # 为满足体积上限时允许降到的最低质量
+    max_bytes: int = 0  # 体积上限, 0 表示不限制
+    subsampling: str = "4:2:0"  # JPEG 色度抽样 (WebP 固定为 4:2:0, PNG 不抽样)
+    progressive: bool = True  # 渐进式 JPEG
+    optimize: bool = True  # 优化 JPEG 霍夫曼表 / PNG 压缩
+
+    @classmethod
+    def from_config(cls, config: dict) -> "EncoderSettings":
+        """根据插件配置构建编码参数, 无效值退回默认值"""
+        image_format = str(config.get("image_format", FORMAT_JPEG)).lower()
+        if image_format not in FORMAT_EXTENSIONS:
+            image_format = FORMAT_JPEG
+        subsampling = str(config.get("jpeg_subsampling", "4:2:0"))
+        if subsampling not in SUBSAMPLING_OPTIONS:
+            subsampling = "4:2:0"
+        quality = min(100, max(1, int(config.get("image_quality", 88))))
+        return cls(
+            format=image_format,
+            quality=quality,
+            min_quality=min(quality, 40),
+            max_bytes=max(0, int(config.get("image_max_kb", 0))) * 1024,
+            subsampling=subsampling,
+            progressive=bool(config.get("jpeg_progressive", True)),
+        )
+
+    @property
+    def extension(self) -> str:
+        return FORMAT_EXTENSIONS[self.format]
+
+    @property
+    def cache_tag(self) -> str:
+        """区分不同编码参数的缓存标签, 修改配置后不会复用旧图片"""
+        tag = f"{self.format}{self.quality}"
+        if self.format == FORMAT_JPEG:
+            tag += f"s{self.subsampling.replace(':', '')}"
+            if self.progressive:
+                tag += "p"
+        if self.max_bytes:
+            tag += f"b{self.max_bytes // 1024}"
+        return tag
+
+
+@dataclass
+class EncodedImage:
+    """编码结果"""
+
+    data: bytes
+    format: str
+    quality: int  # PNG 时为调色板颜色数
+    fits_budget: bool = True
+
+
+# 每个模板 (及编码参数) 上一次满足体积上限的质量, 同一模板的图片体积相近,
+# 下次直接从该质量开始验证, 通常只需编码一两次
+_quality_cache: Dict[Tuple[str, EncoderSettings], int] = {}
+_quality_lock = threading.Lock()
+
+
+def _save(image: "Image.Image", settings: EncoderSettings, quality: int) -> bytes:
+    buffer = BytesIO()
+    if settings.format == FORMAT_PNG:
+        image.quantize(colors=quality).save(
+            buffer, format="PNG", optimize=settings.optimize
+        )
+    elif settings.format == FORMAT_WEBP:
+        # Pillow 的 WebP 有损编码固定为 4:2:0, 不接受色度抽样参数, subsampling 只作用于 JPEG
+        image.save(buffer, format="WEBP", quality=quality, method=6)
+    else:
+        image.save(
+            buffer,
+            format="JPEG",
+            quality=quality,
+            optimize=settings.optimize,
+            progressive=settings.progressive,
+            subsampling=settings.subsampling,
+        )
+    return buffer.getvalue()
+
+
+def _quality_steps(settings: EncoderSettings) -> Tuple[int, ...]:
+    """从高到低排列的可选质量档位"""
+    if settings.format == FORMAT_PNG:
+        return PNG_PALETTE_STEPS
+    return tuple(range(settings.quality, settings.min_quality - 1, -1))
+
+
+def encode_image(
+    image: "Image.Image", settings: EncoderSettings, template_key: str = ""
+) -> EncodedImage:
+    """按编码参数编码图片, 设置了体积上限时搜索满足上限的最高质量
+
+    :param image: 待编码的图片
+    :param settings: 编码参数
+    :param template_key: 底图标识, 用于缓存每个模板选定的质量
+    :return: 编码结果; 最低质量仍超出上限时返回最低质量的结果, fits_budget 为 False
+    """
+    steps = _quality_steps(settings)
+    if not settings.max_bytes:
+        return EncodedImage(_save(image, settings, steps[0]), settings.format, steps[0])
+
+    cache_key = (template_key, settings)
+    with _quality_lock:
+        cached = _quality_cache.get(cache_key)
+
+    encoded: Dict[int, bytes] = {}
+
+    def fits(index: int) -> bool:
+        quality = steps[index]
+        if quality not in encoded:
+            encoded[quality] = _save(image, settings, quality)
+        return len(encoded[quality]) <= settings.max_bytes
+
+    # 体积随质量单调递减, 二分查找第一个 (质量最高的) 满足上限的档位;
+    # 有缓存时先验证缓存的档位及其上一档, 命中则无需搜索
+    low, high = 0, len(steps) - 1
+    if cached in steps:
+        index = steps.index(cached)
+        if fits(index):
+            if index == 0 or not fits(index - 1):
+                low = high = index
+            else:
+                high = index - 1
+        else:
+            low = index + 1
+    while low < high:
+        mid = (low + high) // 2
+        if fits(mid):
+            high = mid
+        else:
+            low = mid + 1
+
+    index = min(low, len(steps) - 1)
+    ok = fits(index)
+    quality = steps[index]
+    if ok:
+        with _quality_lock:
+            _quality_cache[cache_key] = quality
+    return EncodedImage(encoded[quality], settings.format, quality, fits_budget=ok)
+
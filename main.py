@@ -1,15 +1,34 @@
+import os
+import re
+import sqlite3
 import asyncio
 import traceback
-import aiohttp
-import datetime
-import base64
+import time
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
-from astrbot.core.message.message_event_result import MessageChain
-from astrbot.api.message_components import Plain, Image
 from astrbot.api.event.filter import EventMessageType
-from .news_image_generator import create_news_image_from_data
+from .render_service import RenderService
+from .image_encoder import EncoderSettings
+from .news_cache import CachedEdition, NewsCache
+from .circuit_breaker import CircuitOpenError
+from .config import ARCHIVE_PATH, CACHE_DIR, DOWNLOAD_DIR, JOURNAL_PATH, TEMP_DIR
+from .edition_archive import EditionArchive
+from .http_client import HttpClient
+from .image_download import ImageDownloader
+from .news_sources import NewsAggregator, parse_sources
+from .delivery import DeliveryReport, DeliveryScheduler, parse_rate_overrides
+from .delivery_journal import DeliveryJob, DeliveryJournal, firing_slot, format_status
+from .payload import PreparedPayload
+from .scheduler import PushScheduler
+from .metrics import PushMetrics
+from .single_flight import SingleFlight
+
+NEWS_API_URL = "https://ai-news-api.hhzm.win/"
+METRICS_PATH = os.path.join(TEMP_DIR, "daily_news_metrics.prom")
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+ERROR_RETRY_DELAY = 30
+CORRECTION_NOTICE = "【更正】今日新闻已更新, 以下为最新内容"
 
 
 @register(
@@ -21,6 +40,7 @@ from .news_image_generator import create_news_image_from_data
 class DailyNewsPlugin(Star):
     def __init__(self, context: Context, config: dict):
         super().__init__(context)
+        init_started = time.perf_counter()
         self.config = config
         self.target_groups = config.get("target_groups", [])
         
@@ -35,26 +55,155 @@ class DailyNewsPlugin(Star):
             
         self.show_text_news = config.get("show_text_news", False)
         self.use_local_image_draw = config.get("use_local_image_draw", True)
+        self.image_send_mode = config.get("image_send_mode", "auto")
+        # 提前获取并生成新闻的时间窗口, 推送时刻只负责投递
+        self.prefetch_lead = max(0, config.get("prefetch_lead_minutes", 5)) * 60
+        self.prefetch_poll_interval = max(5, config.get("prefetch_poll_interval", 60))
+        # 最近一次生成好的新闻, 新一期迟迟未发布时作为兜底
+        self.last_edition = None
+        # 推送时刻仍未获取到当天新闻时, 最多再等待的时间, 之后先推送旧新闻 (不超过错过推送的容忍时间)
+        self.stale_grace = min(max(0, config.get("stale_grace_seconds", 60)), 240)
+        # 推送旧新闻后在后台继续获取当天新闻的时间窗口
+        self.refresh_window = max(0, config.get("refresh_window_minutes", 120)) * 60
+        # 获取到当天新闻后是否向已推送旧新闻的群组发送更正
+        self.send_correction = config.get("send_correction", False)
+        # 后台任务 (定时推送/预热/刷新/重试/恢复投递) 及其启动时间, 卸载或重载时统一取消
+        self._background_tasks = {}
+
+        # 本地绘制图片的编码参数 (格式/质量/体积上限)
+        self.encoder = EncoderSettings.from_config(config)
+        # 本地图片渲染服务, 所有调用方共享同一个渲染池
+        self.render_service = RenderService(
+            logger,
+            executor_type=config.get("render_executor", "thread"),
+            max_workers=config.get("render_workers", 2),
+            max_concurrency=config.get("render_concurrency", 2),
+            encoder=self.encoder,
+        )
+        # 插件生命周期内共享的 HTTP 客户端 (连接池/超时/重试/条件请求)
+        self.http = HttpClient(
+            logger,
+            user_agent="AI-Daily-News Plugin 2.0.2",
+            timeout=config.get("http_timeout", 15),
+            max_retries=config.get("http_max_retries", 3),
+        )
+        # 新闻源: 并发查询配置的多个接口, 按策略选取或合并; 每个接口连续失败后单独熔断
+        self.sources = NewsAggregator(
+            self.http,
+            parse_sources(
+                config.get("news_sources", []),
+                NEWS_API_URL,
+                failure_threshold=config.get("api_failure_threshold", 3),
+                reset_timeout=config.get("api_cooldown_seconds", 120),
+            ),
+            strategy=config.get("source_strategy", "first"),
+            fanout=config.get("source_fanout", 3),
+            threshold=config.get("merge_similarity", 0.6),
+            logger=logger,
+        )
+        # 远程图片流式下载到 TEMP_DIR, 限制体积并按 URL/ETag 复用
+        self.downloader = ImageDownloader(
+            self.http,
+            DOWNLOAD_DIR,
+            max_bytes=max(1, config.get("download_max_mb", 10)) * 1024 * 1024,
+            logger=logger,
+        )
+        # 并发投递调度器 (按平台限速)
+        self.delivery = DeliveryScheduler(
+            logger,
+            rate_per_platform=config.get("delivery_rate_limit", 3.0),
+            burst=config.get("delivery_burst", 5),
+            concurrency=config.get("delivery_concurrency", 8),
+            deadline=config.get("delivery_deadline", 300),
+            rate_overrides=parse_rate_overrides(config.get("platform_rate_limits", [])),
+        )
+        # 推送计划: 预先计算好的触发时间最小堆, 支持按群组覆盖推送时间与时区
+        self.scheduler = PushScheduler.from_config(
+            self.push_times,
+            self.target_groups,
+            timezone=config.get("timezone", ""),
+            group_schedules=config.get("group_schedules", []),
+            logger=logger,
+        )
+        # 推送流水线的分阶段耗时与计数
+        self.metrics = PushMetrics(history=config.get("metrics_history", 20))
+        # 历史新闻存档, /get_news YYYY-MM-DD 直接从存档读取
+        self.archive = EditionArchive(
+            ARCHIVE_PATH, retention=config.get("archive_retention", 30), logger=logger
+        )
+        # 投递日志: 按群组去重, 重启后继续未完成的投递, 失败的群组按退避间隔重试
+        self.journal = DeliveryJournal(
+            JOURNAL_PATH,
+            max_attempts=config.get("delivery_max_attempts", 3),
+            logger=logger,
+        )
+        self.delivery_retry_delay = max(1, config.get("delivery_retry_delay", 60))
+        self._retrying_jobs = set()
+        # 合并并发的获取/生成/投递 (如 /get_news 与定时推送同时进行)
+        self.flights = SingleFlight()
+        # 已生成新闻的缓存, 同一期新闻只渲染一次
+        self.news_cache = NewsCache(
+            CACHE_DIR, max_entries=config.get("cache_max_entries", 8), logger=logger
+        )
 
-        # 启动定时任务
-        asyncio.create_task(self.daily_task())
+        # 启动定时任务, 并继续上次未完成的投递; 绘制资源在后台预热, 不阻塞插件加载
+        self.spawn(self.daily_task(), "daily_task")
+        self.spawn(self.resume_deliveries(), "resume_deliveries")
+        if self.use_local_image_draw:
+            self.spawn(self.warm_up(), "warm_up")
+        self.metrics.observe("startup", time.perf_counter() - init_started)
+
+    def spawn(self, coro, name: str):
+        """启动后台任务并记录耗时, 插件卸载时统一取消
+
+        :param coro: 任务协程
+        :param name: 任务名称, 用于日志、指标与 /news_status
+        :return: 创建的任务
+        """
+        task = asyncio.create_task(coro, name=f"daily_news:{name}")
+        self._background_tasks[task] = (name, time.monotonic())
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        name, started = self._background_tasks.pop(task, (task.get_name(), None))
+        if started is not None:
+            self.metrics.observe(f"task_{name}", time.monotonic() - started)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"[每日新闻] 后台任务 {name} 异常退出: {error!r}")
+
+    async def warm_up(self):
+        """在渲染池中预先导入 Pillow 并加载字体与底图"""
+        try:
+            seconds = await self.render_service.warm_up()
+        except Exception as e:
+            logger.warning(f"[每日新闻] 预热绘制资源失败, 将在第一次绘制时加载: {e}")
+            return
+        self.metrics.observe("warm_up", seconds)
+        logger.info(f"[每日新闻] 绘制资源预热完成, 耗时 {seconds:.2f}s")
 
     # 获取60s新闻数据
-    async def fetch_news_data(self):
-        """获取每日60s新闻数据
+    async def fetch_news_data(self, today=None):
+        """获取每日60s新闻数据, 期望同一日期的并发调用共享同一次请求
 
+        :param today: 期望的新闻日期 (YYYY-MM-DD), 默认为推送时区中的当前日期
         :return: 新闻数据
         :rtype: dict
         """
+        today = today or self.scheduler.today()
+        return await self.flights.run(
+            ("fetch", today), lambda: self._fetch_news_data(today)
+        )
+
+    async def _fetch_news_data(self, today):
         try:
-            url = "https://ai-news-api.hhzm.win/"
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers={"User-Agent": "AI-Daily-News Plugin 2.0.2"}) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data["data"]
-                    else:
-                        raise Exception(f"API返回错误代码: {response.status}")
+            return await self.sources.fetch(today)
+        except CircuitOpenError as e:
+            logger.warning(f"[每日新闻] 所有新闻源均已熔断: {e}")
+            raise
         except Exception as e:
             logger.error(f"[每日新闻] 获取新闻数据时出错: {e}")
             traceback.print_exc()
@@ -62,25 +211,22 @@ class DailyNewsPlugin(Star):
 
     # 下载60s新闻图片
     async def download_image(self, news_data):
-        """下载每日60s图片
+        """下载每日60s图片到本地文件
 
         :param news_data: 新闻数据
-        :return: 图片的base64编码
-        :rtype: str
+        :return: 下载好的图片文件
+        :rtype: DownloadedImage
         """
         try:
             image_url = news_data["image"]
             logger.info(f"[每日新闻] 从URL下载图片: {image_url}")
 
-            async with aiohttp.ClientSession() as session:
-                timeout = aiohttp.ClientTimeout(total=30)
-                async with session.get(image_url, timeout=timeout) as response:
-                    if response.status != 200:
-                        raise Exception(f"下载图片失败，状态码: {response.status}")
-                    image_data = await response.read()
-                    logger.info(f"[每日新闻] 图片下载成功, 大小: {len(image_data)}字节")
-                    base64_data = base64.b64encode(image_data).decode("utf-8")
-                    return base64_data
+            image = await self.downloader.fetch(image_url)
+            if image.reused:
+                logger.info(f"[每日新闻] 图片未变化, 复用已下载的文件: {image.path}")
+            else:
+                logger.info(f"[每日新闻] 图片下载成功, 大小: {image.size}字节")
+            return image
         except Exception as e:
             logger.error(f"[每日新闻] 下载图片时出错: {e}")
             traceback.print_exc()
@@ -107,145 +253,634 @@ class DailyNewsPlugin(Star):
 
         return text
 
+    # 获取(或生成)一期新闻的图片与文本
+    async def prepare_edition(self, news_data, run=None):
+        """生成新闻图片与文本, 同一期新闻命中缓存时直接复用
+
+        同一期新闻正在生成时, 后续调用等待同一次生成的结果。
+
+        :param news_data: 新闻数据
+        :param run: 本次推送的计时记录
+        :return: 生成好的新闻
+        :rtype: CachedEdition
+        """
+        run = run or self.metrics.start_run("prepare")
+        run.edition = news_data.get("date")
+        if self.use_local_image_draw:
+            variant = f"local-{self.encoder.cache_tag}"
+        else:
+            variant = "remote"
+        key = ("prepare",) + NewsCache.make_key(news_data, variant)
+        return await self.flights.run(
+            key, lambda: self._prepare_edition(news_data, variant, run)
+        )
+
+    async def _prepare_edition(self, news_data, variant, run):
+        cached = await asyncio.to_thread(self.news_cache.get, news_data, variant)
+        if cached is not None:
+            logger.info(f"[每日新闻] 命中新闻缓存: {cached.date} ({cached.content_hash})")
+            self.metrics.inc("cache_lookups_total", "hit")
+            self.last_edition = cached
+            return cached
+        self.metrics.inc("cache_lookups_total", "miss")
+
+        text_news = self.generate_news_text(news_data)
+        if not self.use_local_image_draw:
+            with run.stage("download"):
+                image = await self.download_image(news_data)
+            ext = image.format
+            edition = await asyncio.to_thread(
+                self.news_cache.put_file, news_data, variant, image.path, text_news, ext
+            )
+        else:
+            with run.stage("render"):
+                image_bytes, timings = await self.render_service.render_news_image_timed(
+                    news_data
+                )
+            for stage, seconds in timings.items():
+                run.add_stage(stage, seconds)
+            if image_bytes is None:
+                raise Exception("本地绘制新闻图片失败")
+            ext = self.encoder.extension
+            edition = await asyncio.to_thread(
+                self.news_cache.put, news_data, variant, image_bytes, text_news, ext
+            )
+        self.last_edition = edition
+        await self.archive_edition(news_data, variant, edition, ext)
+        return edition
+
+    # 存档新生成的新闻
+    async def archive_edition(self, news_data, variant, edition, ext):
+        """将一期新闻的原始数据、图片与文本写入历史存档, 失败时只记录日志"""
+
+        def store():
+            self.archive.store(
+                news_data,
+                variant,
+                edition.content_hash,
+                edition.text,
+                edition.read_image(),
+                ext,
+            )
+
+        try:
+            await asyncio.to_thread(store)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"[每日新闻] 写入历史存档失败: {e}")
+
+    # 获取最近一期可用的新闻
+    async def stale_edition(self):
+        """最近一期可用的新闻: 上一次生成的新闻, 重启后从历史存档中读取
+
+        :return: 生成好的新闻, 没有任何可用新闻时返回 None
+        :rtype: CachedEdition
+        """
+        if self.last_edition is not None:
+            return self.last_edition
+        try:
+            dates = await asyncio.to_thread(self.archive.dates, 1)
+            archived = await asyncio.to_thread(self.archive.get, dates[0]) if dates else None
+        except sqlite3.Error as e:
+            logger.warning(f"[每日新闻] 读取历史存档失败: {e}")
+            return None
+        if archived is None:
+            return None
+        self.last_edition = CachedEdition(
+            date=archived.date,
+            content_hash=archived.content_hash,
+            image=archived.image,
+            text=archived.text,
+        )
+        return self.last_edition
+
     # 向指定群组推送60s新闻
-    async def send_daily_news(self):
-        """向所有目标群组推送每日新闻"""
+    async def send_daily_news(self, send_image=True, send_text=None):
+        """向所有目标群组推送每日新闻
+
+        :param send_image: 是否发送图片
+        :param send_text: 是否发送文本, 默认按 show_text_news 配置
+        :return: 投递结果, 出错时返回 None
+        :rtype: DeliveryReport
+        """
+        run = self.metrics.start_run("manual")
         try:
-            news_data = await self.fetch_news_data()
-            logger.debug(f"[每日新闻] 获取到的新闻数据: {news_data}")
-            if not self.use_local_image_draw:
-                image_data = await self.download_image(news_data)
-            else:
-                image_data = create_news_image_from_data(news_data, logger)
-                logger.debug(
-                    f"[图片生成] 生成的图片 Base64 数据前 100 字符: {image_data[:100]}"
+            try:
+                with run.stage("fetch"):
+                    news_data = await self.fetch_news_data()
+                logger.debug(f"[每日新闻] 获取到的新闻数据: {news_data}")
+                edition = await self.prepare_edition(news_data, run)
+            except Exception as e:
+                # API 不可用时推送最近一期可用的新闻
+                edition = await self.stale_edition()
+                if edition is None:
+                    raise
+                logger.warning(
+                    f"[每日新闻] 获取新闻失败 ({e}), 推送最近一期可用的新闻: {edition.date}"
                 )
+            report = await self.deliver_edition(
+                edition, run=run, send_image=send_image, send_text=send_text
+            )
+            await self.finish_run(run, True)
+            return report
+        except Exception as e:
+            logger.error(f"[每日新闻] 推送每日新闻时出错: {e}")
+            traceback.print_exc()
+            await self.finish_run(run, False)
+            return None
 
-            if not self.target_groups:
-                logger.info("[每日新闻] 未配置目标群组")
-                return
+    # 记录一次推送的指标
+    async def finish_run(self, run, ok):
+        """结束一次推送的计时, 并导出 Prometheus 文本到 TEMP_DIR"""
+        self.metrics.finish_run(run, ok)
+        try:
+            await asyncio.to_thread(self.metrics.dump, METRICS_PATH)
+        except OSError as e:
+            logger.warning(f"[每日新闻] 写出指标文件失败: {e}")
+
+    # 投递已生成好的新闻
+    async def deliver_edition(
+        self,
+        edition,
+        groups=None,
+        run=None,
+        send_image=True,
+        send_text=None,
+        notice=None,
+        slot=None,
+    ):
+        """向目标群组投递一期已生成好的新闻
+
+        同一期新闻以相同方式向相同群组的投递正在进行时, 等待该次投递而不重复发送;
+        投递日志中已收到这期新闻的群组会被跳过, 投递失败的群组在后台按退避间隔重试。
+        定时推送按触发时间区分投递任务, 同一天的多次推送都会发送; 手动推送同一期新闻只发送一次。
+
+        :param edition: 生成好的新闻
+        :param groups: 目标群组, 默认为所有配置的目标群组
+        :param run: 本次推送的计时记录
+        :param send_image: 是否发送图片
+        :param send_text: 是否发送文本, 默认按 show_text_news 配置
+        :param notice: 在新闻之前发送的说明 (如更正提示)
+        :param slot: 定时推送的触发标识 (见 firing_slot), 手动推送为 None
+        :return: 投递结果, 没有目标群组时返回 None
+        :rtype: DeliveryReport
+        """
+        groups = list(self.target_groups if groups is None else groups)
+        if send_text is None:
+            send_text = self.show_text_news
+        if not groups:
+            logger.info("[每日新闻] 未配置目标群组")
+            return None
+
+        key = (
+            "deliver",
+            edition.date,
+            edition.content_hash,
+            frozenset(groups),
+            send_image,
+            send_text,
+            notice,
+            slot,
+        )
+        if self.flights.in_flight(key):
+            logger.info(f"[每日新闻] 相同的推送正在进行中, 等待其完成 ({edition.date})")
+        return await self.flights.run(
+            key,
+            lambda: self._deliver_edition(
+                edition, groups, run, send_image, send_text, notice, slot
+            ),
+        )
 
+    async def _deliver_edition(
+        self, edition, groups, run, send_image, send_text, notice, slot
+    ):
+        run = run or self.metrics.start_run("deliver")
+        run.edition = edition.date
+        job = DeliveryJob.for_edition(edition, send_image, send_text, notice, slot)
+        # 每个群组已发出的消息条数, 重试或恢复投递时只发送尚未发出的部分, 避免重复发送图片
+        progress = {}
+        try:
+            claimed = await asyncio.to_thread(self.journal.claim, job, groups)
+            progress = await asyncio.to_thread(self.journal.progress, job.job_id)
+        except sqlite3.Error as e:
+            logger.warning(f"[每日新闻] 读写投递日志失败, 本次不做去重: {e}")
+            job, claimed = None, groups
+        skipped = [group_id for group_id in groups if group_id not in set(claimed)]
+        if skipped:
             logger.info(
-                f"[每日新闻] 准备向 {len(self.target_groups)} 个群组推送每日新闻"
+                f"[每日新闻] {len(skipped)} 个群组已收到或正在接收这期新闻, 跳过: {', '.join(skipped)}"
             )
+        if not claimed:
+            return DeliveryReport(skipped=skipped)
+        groups = claimed
+
+        # 消息只构建一次, 所有群组复用
+        with run.stage("payload"):
+            payload = PreparedPayload.from_edition(edition, self.image_send_mode)
+
+        logger.info(
+            f"[每日新闻] 准备向 {len(groups)} 个群组推送每日新闻 ({edition.date})"
+        )
+
+        # 手动推送时已通过其他投递任务 (包括定时推送) 收到全部消息的群组
+        already_received = set()
 
-            for group_id in self.target_groups:
+        async def send_to_group(group_id):
+            # 手动推送: 同一期新闻中群组已收到的图片/文本不再发送, 不区分定时推送与手动推送
+            delivered = set()
+            if job is not None and not slot:
                 try:
-                    # 首先发送图片
-                    image_message_chain = MessageChain()
-                    image_message = [Image.fromBase64(image_data)]
-                    image_message_chain.chain = image_message
-                    logger.info(f"[每日新闻] 向群组 {group_id} 发送图片")
-                    await self.context.send_message(group_id, image_message_chain)
-
-                    # 如果配置了显示文本新闻，则发送文本
-                    if self.show_text_news:
-                        text_message_chain = MessageChain()
-                        text_news = self.generate_news_text(news_data)
-                        text_message = [Plain(text_news)]
-                        text_message_chain.chain = text_message
-                        await self.context.send_message(group_id, text_message_chain)
-
-                    logger.info(f"[每日新闻] 已向群 {group_id} 推送每日新闻")
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logger.error(f"[每日新闻] 向群组 {group_id} 推送消息时出错: {e}")
-                    traceback.print_exc()
-        except Exception as e:
-            logger.error(f"[每日新闻] 推送每日新闻时出错: {e}")
-            traceback.print_exc()
+                    delivered = await asyncio.to_thread(
+                        self.journal.delivered_parts,
+                        edition.date,
+                        edition.content_hash,
+                        group_id,
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"[每日新闻] 读取投递日志失败, 本次不做去重: {e}")
+
+            # 依次发送附加说明、图片与文本
+            parts = payload.parts(group_id, send_image, send_text, notice)
+            resumed = progress.get(group_id, 0)
+            sent = 0
+            for index, (name, chain) in enumerate(parts):
+                if index < progress.get(group_id, 0):
+                    continue
+                if name not in delivered:
+                    if name == "image":
+                        logger.info(f"[每日新闻] 向群组 {group_id} 发送图片")
+                    await self.context.send_message(group_id, chain)
+                    sent += 1
+                progress[group_id] = index + 1
+                if job is not None and index + 1 < len(parts):
+                    await self.journal_mark(
+                        self.journal.mark_progress, job.job_id, group_id, index + 1
+                    )
+
+            if not sent and not resumed:
+                already_received.add(group_id)
+                logger.info(f"[每日新闻] 群 {group_id} 已收到这期新闻, 不再重复发送")
+            else:
+                logger.info(f"[每日新闻] 已向群 {group_id} 推送每日新闻")
+            if job is not None:
+                await self.journal_mark(self.journal.mark_sent, job.job_id, group_id)
+
+        with run.stage("deliver"):
+            report = await self.delivery.deliver(groups, send_to_group)
+        if already_received:
+            report.results = [r for r in report.results if r.group_id not in already_received]
+            skipped += [group_id for group_id in groups if group_id in already_received]
+        report.skipped = skipped
+        self.metrics.record_delivery(run, report)
+        if job is not None:
+            for result in report.failed:
+                await self.journal_mark(
+                    self.journal.mark_failed, job.job_id, result.group_id, result.error or ""
+                )
+            for group_id in report.timed_out:
+                await self.journal_mark(
+                    self.journal.mark_failed, job.job_id, group_id, "推送超时"
+                )
+            if report.failed or report.timed_out:
+                self.schedule_delivery_retry(job, edition)
+        for result in report.failed:
+            logger.error(
+                f"[每日新闻] 向群组 {result.group_id} 推送消息时出错: {result.error}"
+            )
+        if report.timed_out:
+            logger.error(
+                f"[每日新闻] 推送截止时间已到, 未完成的群组: {', '.join(report.timed_out)}"
+            )
+        logger.info(f"[每日新闻] 本轮推送完成: {report.summary()}")
+        return report
+
+    async def journal_mark(self, mark, *args):
+        """更新投递日志, 失败时只记录日志 (最坏情况是重启后重复投递)"""
+        try:
+            await asyncio.to_thread(mark, *args)
+        except sqlite3.Error as e:
+            logger.warning(f"[每日新闻] 写入投递日志失败: {e}")
+
+    # 投递失败的群组按退避间隔重试
+    def schedule_delivery_retry(self, job: DeliveryJob, edition):
+        """启动后台重试, 同一投递任务只有一个重试任务"""
+        if job.job_id in self._retrying_jobs:
+            return
+        self._retrying_jobs.add(job.job_id)
+        task = self.spawn(self.retry_delivery(job, edition), "retry_delivery")
+        task.add_done_callback(lambda _: self._retrying_jobs.discard(job.job_id))
+
+    async def retry_delivery(self, job: DeliveryJob, edition):
+        """重试投递失败的群组, 直到全部送达或达到最大尝试次数
+
+        第 n 次重试前等待 delivery_retry_delay * 2^(n-1) 秒。
+        """
+        while True:
+            try:
+                pending = await asyncio.to_thread(self.journal.retryable, job.job_id)
+            except sqlite3.Error as e:
+                logger.warning(f"[每日新闻] 读取投递日志失败, 停止重试: {e}")
+                return
+            if not pending:
+                return
+            attempts = max(item.attempts for item in pending)
+            delay = self.delivery_retry_delay * 2 ** max(0, attempts - 1)
+            logger.info(
+                f"[每日新闻] {len(pending)} 个群组投递失败, {delay:.0f} 秒后重试 ({job.job_id})"
+            )
+            await asyncio.sleep(delay)
+            try:
+                await self.deliver_edition(
+                    edition,
+                    [item.group_id for item in pending],
+                    send_image=job.send_image,
+                    send_text=job.send_text,
+                    notice=job.notice or None,
+                    slot=job.slot or None,
+                )
+            except Exception as e:
+                logger.error(f"[每日新闻] 重试投递出错: {e}")
+                return
+
+    # 继续上次未完成的投递
+    async def resume_deliveries(self):
+        """插件启动时继续投递日志中未完成的任务, 已送达的群组不会重复发送"""
+        try:
+            jobs = await asyncio.to_thread(self.journal.recover)
+        except sqlite3.Error as e:
+            logger.warning(f"[每日新闻] 读取投递日志失败: {e}")
+            return
+        for job in jobs:
+            edition = await self.journal_edition(job)
+            if edition is None:
+                logger.warning(
+                    f"[每日新闻] 存档中已没有这期新闻, 无法继续投递: {job.job_id}"
+                )
+                continue
+            groups = await asyncio.to_thread(self.journal.groups, job.job_id)
+            logger.info(f"[每日新闻] 继续上次未完成的投递: {job.job_id}")
+            try:
+                await self.deliver_edition(
+                    edition,
+                    groups,
+                    send_image=job.send_image,
+                    send_text=job.send_text,
+                    notice=job.notice or None,
+                    slot=job.slot or None,
+                )
+            except Exception as e:
+                logger.error(f"[每日新闻] 继续投递失败: {e}")
+
+    async def journal_edition(self, job: DeliveryJob):
+        """根据投递任务找回对应的新闻, 内容已更新或存档已清理时返回 None"""
+        edition = self.last_edition
+        if edition is not None and edition.content_hash == job.content_hash:
+            return edition
+        try:
+            archived = await asyncio.to_thread(self.archive.get, job.date)
+        except sqlite3.Error as e:
+            logger.warning(f"[每日新闻] 读取历史存档失败: {e}")
+            return None
+        if archived is None or archived.content_hash != job.content_hash:
+            return None
+        return CachedEdition(
+            date=archived.date,
+            content_hash=archived.content_hash,
+            image=archived.image,
+            text=archived.text,
+        )
+
+    # 在推送前的时间窗口内预先获取并生成新闻
+    async def prefetch_edition(self, deadline: float, today: str, run=None):
+        """在截止时间之前获取并生成当天的新闻
+
+        新闻 API 尚未发布当天新闻时按间隔轮询; 到截止时间 (推送时刻 + 宽限时间) 仍未获取到,
+        则退回到已获取到的最新一期或最近一期可用的新闻。
+        单次请求超过截止时间时不再等待, 请求在后台继续, 结果留给之后的刷新复用。
+
+        :param deadline: 截止时间 (时间戳)
+        :param today: 期望的新闻日期 (YYYY-MM-DD)
+        :param run: 本次推送的计时记录
+        :return: (生成好的新闻, 是否为当天的新闻); 完全无可用新闻时新闻为 None
+        """
+        run = run or self.metrics.start_run("prefetch")
+        latest_data = None
+        while True:
+            try:
+                with run.stage("fetch"):
+                    # 获取与生成都经过 SingleFlight, 超时只放弃等待, 不会取消进行中的请求
+                    news_data = await asyncio.wait_for(
+                        self.fetch_news_data(today), max(1.0, deadline - time.time())
+                    )
+                latest_data = news_data
+                if news_data.get("date") == today:
+                    edition = await asyncio.wait_for(
+                        self.prepare_edition(news_data, run),
+                        max(1.0, deadline - time.time()),
+                    )
+                    logger.info(f"[每日新闻] 已提前准备好 {today} 的新闻")
+                    return edition, True
+                logger.info(
+                    f"[每日新闻] API 尚未发布 {today} 的新闻 (当前为 {news_data.get('date')}), 稍后重试"
+                )
+            except asyncio.TimeoutError:
+                logger.warning("[每日新闻] 获取或生成新闻超过截止时间")
+            except Exception as e:
+                logger.warning(f"[每日新闻] 预取新闻失败: {e}")
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(self.prefetch_poll_interval, remaining))
+
+        if latest_data is not None:
+            logger.warning(
+                f"[每日新闻] 截止时间已到, 使用最新可用的新闻: {latest_data.get('date')}"
+            )
+            try:
+                edition = await self.prepare_edition(latest_data, run)
+                return edition, edition.date == today
+            except Exception as e:
+                logger.error(f"[每日新闻] 生成兜底新闻失败: {e}")
+        edition = await self.stale_edition()
+        if edition is not None:
+            logger.warning(f"[每日新闻] 使用最近一期可用的新闻: {edition.date}")
+        return edition, edition is not None and edition.date == today
+
+    # 推送旧新闻后在后台继续获取当天新闻
+    def start_revalidation(self, today: str, groups, received, slot=None):
+        """启动后台刷新任务"""
+        if self.refresh_window > 0:
+            self.spawn(self.revalidate_edition(today, groups, received, slot), "revalidate")
+
+    async def revalidate_edition(self, today: str, groups, received, slot=None):
+        """在刷新窗口内按间隔获取当天的新闻
+
+        获取到后: 没有收到旧新闻的群组直接补发; 已收到旧新闻的群组按 send_correction 配置发送更正。
+
+        :param today: 期望的新闻日期 (YYYY-MM-DD)
+        :param groups: 本次推送的群组
+        :param received: 已收到旧新闻的群组
+        :param slot: 本次定时推送的触发标识, 补发与更正计入同一次推送
+        """
+        deadline = time.time() + self.refresh_window
+        while time.time() < deadline:
+            await asyncio.sleep(self.prefetch_poll_interval)
+            try:
+                news_data = await self.fetch_news_data(today)
+                if news_data.get("date") != today:
+                    continue
+                edition = await self.prepare_edition(news_data)
+            except Exception as e:
+                logger.debug(f"[每日新闻] 后台刷新新闻失败: {e}")
+                continue
+
+            missing = [group_id for group_id in groups if group_id not in received]
+            if missing:
+                logger.info(f"[每日新闻] 已获取到 {today} 的新闻, 向 {len(missing)} 个群组补发")
+                await self.deliver_edition(edition, missing, slot=slot)
+            if received and self.send_correction:
+                logger.info(f"[每日新闻] 已获取到 {today} 的新闻, 发送更正")
+                await self.deliver_edition(
+                    edition, sorted(received), notice=CORRECTION_NOTICE, slot=slot
+                )
+            elif received:
+                logger.info(f"[每日新闻] 已获取到 {today} 的新闻, 下次推送将使用最新内容")
+            return
+        logger.warning(f"[每日新闻] 刷新窗口内仍未获取到 {today} 的新闻, 停止刷新")
 
     # 计算到下一个指定时间的秒数
     def calculate_sleep_time(self):
-        """计算到下一次推送时间的秒数"""
-        now = datetime.datetime.now()
-        next_push_times = []
-        
-        # Calculate next push time for each configured time
-        for push_time in self.push_times:
-            hour, minute = map(int, push_time.split(":"))
-            next_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            # If time already passed today, schedule for tomorrow
-            if next_time <= now:
-                next_time += datetime.timedelta(days=1)
-                
-            next_push_times.append(next_time)
-        
-        # Find the earliest next push time
-        earliest_time = min(next_push_times)
-        seconds = (earliest_time - now).total_seconds()
-        return seconds
+        """计算到下一次推送时间的秒数, 没有任何推送计划时返回 None"""
+        batch = self.scheduler.peek()
+        if batch is None:
+            return None
+        return max(0.0, batch.fire_at - time.time())
 
     # 定时任务
     async def daily_task(self):
         """定时推送任务"""
         while True:
             try:
-                # 计算到下次推送的时间
-                sleep_time = self.calculate_sleep_time()
+                batch = self.scheduler.peek()
+                if batch is None:
+                    logger.info("[每日新闻] 未配置任何推送时间, 定时任务退出")
+                    return
+                sleep_time = batch.fire_at - time.time()
                 logger.info(f"[每日新闻] 下次推送将在 {sleep_time/3600:.2f} 小时后")
 
-                # 等待到设定时间
-                await asyncio.sleep(sleep_time)
-
-                # 推送新闻
-                await self.send_daily_news()
+                # 等待到预取窗口开始, 提前获取并生成新闻; 时钟跳变时重新计算
+                if not await self.scheduler.sleep_until(batch.fire_at - self.prefetch_lead):
+                    continue
+                run = self.metrics.start_run("scheduled")
+                edition, fresh = await self.prefetch_edition(
+                    batch.fire_at + self.stale_grace, batch.local_date, run
+                )
 
-                # 再等待一段时间，避免重复推送
-                await asyncio.sleep(60)
+                # 等待到设定时间, 只负责投递
+                if not await self.scheduler.sleep_until(batch.fire_at):
+                    continue
+                due = self.scheduler.pop_due(time.time())
+                if due is None:
+                    continue
+                report = None
+                # 每次触发是独立的投递任务, 同一天的多个推送时间与旧新闻兜底都会正常发送
+                slot = firing_slot(due.fire_at)
+                if edition is not None:
+                    report = await self.deliver_edition(edition, due.groups, run, slot=slot)
+                    await self.finish_run(run, True)
+                else:
+                    logger.error("[每日新闻] 暂无可推送的新闻, 获取到新闻后将补发")
+                    await self.finish_run(run, False)
+                if not fresh:
+                    # stale-while-revalidate: 先推送旧新闻, 后台继续获取当天新闻
+                    received = {r.group_id for r in report.succeeded} if report else set()
+                    self.start_revalidation(batch.local_date, due.groups, received, slot)
             except Exception as e:
                 logger.error(f"[每日新闻] 定时任务出错: {e}")
                 traceback.print_exc()
-                await asyncio.sleep(300)
+                await asyncio.sleep(ERROR_RETRY_DELAY)
+
+    def task_status(self) -> str:
+        now = time.monotonic()
+        tasks = sorted(self._background_tasks.values(), key=lambda item: item[1])
+        return ", ".join(f"{name}({now - started:.0f}s)" for name, started in tasks) or "无"
 
     @filter.command("news_status")
     async def check_status(self, event: AstrMessageEvent):
         """检查插件状态"""
-        now = datetime.datetime.now()
-        sleep_time = self.calculate_sleep_time()
+        sleep_time = self.calculate_sleep_time() or 0
         hours = int(sleep_time / 3600)
         minutes = int((sleep_time % 3600) / 60)
 
-        push_times_str = ', '.join(self.push_times)
-        
+        push_times_str = ', '.join(
+            sorted({slot.label for slot in self.scheduler.slots})
+        )
+
         yield event.plain_result(
             f"每日60s新闻插件正在运行\n"
-            f"目标群组: {', '.join(map(str, self.target_groups))} \n"
+            f"目标群组: {', '.join(map(str, sorted(self.scheduler.groups)))} \n"
             f"推送时间: {push_times_str}\n"
             f"文本新闻显示: {'开启' if self.show_text_news else '关闭'}\n"
-            f"距离下次推送还有: {hours}小时{minutes}分钟"
+            f"距离下次推送还有: {hours}小时{minutes}分钟\n"
+            f"新闻源 ({self.sources.strategy}):\n{self.sources.status_text()}\n"
+            f"后台任务: {self.task_status()}\n"
+            f"\n最近推送:\n{self.metrics.status_text()}"
         )
 
+    @filter.command("news_delivery")
+    async def delivery_status(self, event: AstrMessageEvent, date: str = ""):
+        """查询各群组的投递状态
+
+        Args:
+            date: 新闻日期 (YYYY-MM-DD), 默认为最近一期
+        """
+        if date and not DATE_PATTERN.fullmatch(date):
+            yield event.plain_result("日期格式应为 YYYY-MM-DD")
+            return
+        rows = await asyncio.to_thread(self.journal.status, date or None)
+        if not rows:
+            yield event.plain_result(f"没有{date or '任何'}的投递记录")
+            return
+        yield event.plain_result(format_status(rows))
+
     @filter.command("get_news")
-    async def manual_get_news(self, event: AstrMessageEvent, mode: str = "all"):
-        """手动获取今日新闻
+    async def manual_get_news(
+        self, event: AstrMessageEvent, mode: str = "all", history_mode: str = "all"
+    ):
+        """手动获取今日新闻, 或查询历史新闻
 
         Args:
-            mode: 获取模式，可选值: image(仅图片)/text(仅文本)/all(图片+文本)
+            mode: 获取模式，可选值: image(仅图片)/text(仅文本)/all(图片+文本)，也可以是 YYYY-MM-DD 格式的日期
+            history_mode: 查询历史新闻时的获取模式
         """
         try:
-            # 保存原始配置
-            original_show_text = self.show_text_news
-
-            # 根据命令参数临时调整配置
-            if mode == "text":
-                self.show_text_news = True  # 仅文本模式，启用文本显示
-            elif mode == "image":
-                self.show_text_news = False  # 仅图片模式，禁用文本显示
-            elif mode == "all":
-                self.show_text_news = True  # 全部模式，启用文本显示
-
-            # 直接调用日常推送逻辑
-            logger.info(f"[每日新闻] 手动触发新闻推送，模式: {mode}")
-            await self.send_daily_news()
+            if DATE_PATTERN.fullmatch(mode):
+                yield await self.archived_news_result(event, mode, history_mode)
+                return
 
-            # 恢复原始配置
-            self.show_text_news = original_show_text
+            # 模式只作用于本次推送, 不修改共享配置
+            if mode not in ("image", "text", "all"):
+                yield event.plain_result("模式无效, 可选值: image/text/all")
+                return
+            if not self.target_groups:
+                yield event.plain_result("未配置目标群组")
+                return
+            send_image = mode in ("image", "all")
+            send_text = mode in ("text", "all")
 
-            yield event.plain_result(
-                f"[每日新闻] 已成功向 {len(self.target_groups)} 个群组推送新闻"
-            )
+            logger.info(f"[每日新闻] 手动触发新闻推送，模式: {mode}")
+            report = await self.send_daily_news(send_image=send_image, send_text=send_text)
+
+            if report is None:
+                yield event.plain_result("推送新闻失败, 详情请查看日志")
+            else:
+                failed = len(report.failed) + len(report.timed_out)
+                message = f"[每日新闻] 已成功向 {len(report.succeeded)} 个群组推送新闻"
+                if failed:
+                    message += f", {failed} 个群组推送失败 (将在后台重试)"
+                if report.skipped:
+                    message += f", {len(report.skipped)} 个群组已收到这期新闻, 未重复发送"
+                yield event.plain_result(message)
 
         except Exception as e:
             logger.error(f"[每日新闻] 手动推送新闻时出错: {e}")
@@ -253,3 +888,41 @@ class DailyNewsPlugin(Star):
             yield event.plain_result(f"推送新闻失败: {str(e)}")
         finally:
             event.stop_event()
+
+    async def archived_news_result(self, event: AstrMessageEvent, date: str, mode: str):
+        """从存档中读取某一天的新闻, 直接回复给命令发起者 (不请求 API, 不推送到群组)"""
+        if mode not in ("image", "text", "all"):
+            return event.plain_result("模式无效, 可选值: image/text/all")
+        archived = await asyncio.to_thread(self.archive.get, date)
+        if archived is None:
+            dates = await asyncio.to_thread(self.archive.dates, 7)
+            available = ", ".join(dates) if dates else "无"
+            return event.plain_result(f"存档中没有 {date} 的新闻\n最近的存档: {available}")
+
+        payload = PreparedPayload(archived.image, archived.text)
+        chain = []
+        if mode in ("image", "all"):
+            chain.extend(payload.image_chain(event.unified_msg_origin).chain)
+        if mode in ("text", "all"):
+            chain.extend(payload.text_chain().chain)
+        logger.info(f"[每日新闻] 从存档返回 {date} 的新闻, 模式: {mode}")
+        return event.chain_result(chain)
+
+    async def terminate(self):
+        """插件卸载或重载时停止所有后台任务并释放资源, 重载后不会残留重复的定时任务"""
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        # 合并后的获取/生成/推送不随调用方取消, 需单独取消并等待结束,
+        # 否则它们会在日志数据库关闭后继续推送, 重载后还会与新实例重复发送
+        stuck = await self.flights.cancel_all(timeout=5)
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=5)
+            if pending:
+                logger.warning(f"[每日新闻] {len(pending)} 个后台任务未能及时停止")
+        if stuck:
+            logger.warning(f"[每日新闻] {len(stuck)} 个进行中的获取或推送未能及时停止")
+        self.render_service.close()
+        await self.http.close()
+        await asyncio.to_thread(self.archive.close)
+        await asyncio.to_thread(self.journal.close)
@@ -0,0 +1,204 @@
+import os
+import time
+import datetime
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+from .delivery import DeliveryReport, percentile
+
+# 直方图分桶上界 (秒)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Histogram:
+    """Prometheus 风格的累积直方图"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个为 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return result
+
+
+@dataclass
+class PushRun:
+    """一次推送的计时记录"""
+
+    trigger: str
+    started_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+    ok: bool = True
+    edition: Optional[str] = None
+    stages: Dict[str, float] = field(default_factory=dict)
+    group_durations: Dict[str, float] = field(default_factory=dict)
+    groups_ok: int = 0
+    groups_failed: int = 0
+    _metrics: Optional["PushMetrics"] = field(default=None, repr=False)
+    _mono_start: float = field(default_factory=time.monotonic, repr=False)
+
+    @contextmanager
+    def stage(self, name: str):
+        """记录一个阶段的耗时与成败, 可包住 await 使用"""
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            if self._metrics is not None:
+                self._metrics.inc("stage_failures_total", name)
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            if self._metrics is not None:
+                self._metrics.observe(name, elapsed)
+
+    def add_stage(self, name: str, seconds: float):
+        """记录在别处 (如渲染工作线程/进程中) 测得的阶段耗时"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if self._metrics is not None:
+            self._metrics.observe(name, seconds)
+
+
+class PushMetrics:
+    """推送流水线的结构化指标
+
+    - 每个阶段一个直方图, 以及成功/失败计数
+    - 保留最近 N 次推送记录, 用于 /news_status 展示分位数与最慢群组
+    - 可导出 Prometheus 文本格式
+    """
+
+    def __init__(self, history: int = 20):
+        self.runs: Deque[PushRun] = deque(maxlen=max(1, int(history)))
+        self.histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self.counters: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def inc(self, name: str, label: str = "", value: int = 1):
+        self.counters[(name, label)] += value
+
+    def observe(self, stage: str, seconds: float):
+        self.histograms[stage].observe(seconds)
+
+    def start_run(self, trigger: str) -> PushRun:
+        return PushRun(trigger=trigger, _metrics=self)
+
+    def record_delivery(self, run: PushRun, report: DeliveryReport):
+        """记录一次投递的逐群组结果"""
+        for result in report.results:
+            run.group_durations[result.group_id] = result.duration
+            if result.ok:
+                run.groups_ok += 1
+                self.observe("send", result.duration)
+            else:
+                run.groups_failed += 1
+        run.groups_failed += len(report.timed_out)
+        self.inc("group_sends_total", "success", run.groups_ok)
+        self.inc("group_sends_total", "failure", run.groups_failed)
+
+    def finish_run(self, run: PushRun, ok: bool = True):
+        run.ok = ok
+        run.duration = time.monotonic() - run._mono_start
+        self.observe("run", run.duration)
+        self.inc("runs_total", "success" if ok else "failure")
+        self.runs.append(run)
+
+    @property
+    def last_run(self) -> Optional[PushRun]:
+        return self.runs[-1] if self.runs else None
+
+    def stage_percentiles(self) -> Dict[str, Tuple[float, float]]:
+        """最近 N 次推送中每个阶段的 (p50, p95)"""
+        samples: Dict[str, List[float]] = defaultdict(list)
+        for run in self.runs:
+            for stage, seconds in run.stages.items():
+                samples[stage].append(seconds)
+            samples["run"].append(run.duration)
+        return {
+            stage: (percentile(values, 50), percentile(values, 95))
+            for stage, values in samples.items()
+        }
+
+    def slowest_groups(self, limit: int = 5) -> List[Tuple[str, float]]:
+        """最近一次推送中发送最慢的群组"""
+        run = self.last_run
+        if run is None:
+            return []
+        return sorted(run.group_durations.items(), key=lambda x: x[1], reverse=True)[
+            :limit
+        ]
+
+    def status_text(self, limit: int = 5) -> str:
+        """生成 /news_status 展示用的指标摘要"""
+        if not self.runs:
+            return "暂无推送记录"
+        lines = []
+        for run in list(self.runs)[-limit:]:
+            started = datetime.datetime.fromtimestamp(run.started_at).strftime(
+                "%m-%d %H:%M:%S"
+            )
+            lines.append(
+                f"{started} {run.trigger} {'成功' if run.ok else '失败'} "
+                f"{run.duration:.2f}s 群组 {run.groups_ok}/{run.groups_ok + run.groups_failed}"
+                + (f" ({run.edition})" if run.edition else "")
+            )
+        lines.append(f"最近 {len(self.runs)} 次各阶段耗时 p50/p95:")
+        for stage, (p50, p95) in sorted(self.stage_percentiles().items()):
+            lines.append(f"  {stage}: {p50:.2f}s / {p95:.2f}s")
+        slowest = self.slowest_groups(limit)
+        if slowest:
+            lines.append("最慢群组:")
+            lines.extend(f"  {group_id}: {seconds:.2f}s" for group_id, seconds in slowest)
+        return "\n".join(lines)
+
+    def to_prometheus(self) -> str:
+        """导出 Prometheus 文本格式"""
+        lines = [
+            "# HELP daily_news_stage_seconds Duration of push pipeline stages.",
+            "# TYPE daily_news_stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(self.histograms.items()):
+            for bound, count in histogram.cumulative():
+                lines.append(
+                    f'daily_news_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                )
+            lines.append(f'daily_news_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'daily_news_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            lines.append(f"# TYPE daily_news_{name} counter")
+            for (counter, label), value in sorted(self.counters.items()):
+                if counter != name:
+                    continue
+                key = "stage" if name == "stage_failures_total" else "result"
+                lines.append(f'daily_news_{name}{{{key}="{label}"}} {value}')
+
+        run = self.last_run
+        if run is not None:
+            lines.append("# TYPE daily_news_last_run_duration_seconds gauge")
+            lines.append(f"daily_news_last_run_duration_seconds {run.duration:.6f}")
+            lines.append("# TYPE daily_news_last_run_timestamp_seconds gauge")
+            lines.append(f"daily_news_last_run_timestamp_seconds {run.started_at:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """原子地写出 Prometheus 文本文件 (同步, 请在线程中调用)"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
@@ -0,0 +1,200 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class CachedEdition:
+    """一期已生成好的新闻 (图片 + 文本)
+
+    图片至少有字节或磁盘文件之一; 从磁盘加载或由下载文件写入的条目只保留路径,
+    需要字节时 (如 base64 发送) 再通过 read_image 读取。
+    """
+
+    date: str
+    content_hash: str
+    image: Optional[bytes]
+    text: str
+    image_path: Optional[str] = None  # 磁盘缓存中的图片文件, 写入失败时为 None
+
+    def read_image(self) -> bytes:
+        """获取图片字节 (同步, 可能读取磁盘)"""
+        if self.image is not None:
+            return self.image
+        with open(self.image_path, "rb") as f:
+            return f.read()
+
+
+def news_content_hash(news_data: Dict[str, Any]) -> str:
+    """计算新闻内容的哈希, 同一日期内容有更新时哈希随之变化"""
+    payload = json.dumps(
+        {
+            "date": news_data.get("date"),
+            "news": news_data.get("news", []),
+            "tip": news_data.get("tip", ""),
+            "image": news_data.get("image", ""),
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class NewsCache:
+    """按 新闻日期 + 内容哈希 缓存已生成的新闻图片与文本
+
+    内存中使用 LRU 淘汰, 同时持久化到磁盘, 重启后无需重新渲染。
+    磁盘操作是同步的, 在事件循环中请通过 ``asyncio.to_thread`` 调用。
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 8, logger=None):
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, int(max_entries))
+        self.logger = logger
+        self._entries: "OrderedDict[Tuple[str, str, str], CachedEdition]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(news_data: Dict[str, Any], variant: str) -> Tuple[str, str, str]:
+        return (str(news_data.get("date", "")), news_content_hash(news_data), variant)
+
+    def _paths(self, key: Tuple[str, str, str], ext: str = "jpg") -> Tuple[str, str]:
+        date, content_hash, variant = key
+        stem = os.path.join(
+            os.path.abspath(self.cache_dir), f"{date}_{content_hash}_{variant}"
+        )
+        return f"{stem}.{ext}", f"{stem}.txt"
+
+    def get(self, news_data: Dict[str, Any], variant: str) -> Optional[CachedEdition]:
+        """查找缓存, 内存未命中时尝试从磁盘加载 (只读取文本, 图片保留为路径)
+
+        :param news_data: 新闻数据
+        :param variant: 图片来源与编码参数 (如 local-jpeg88), 不同变体的图片分开缓存
+        :return: 缓存的新闻, 未命中时返回 None
+        """
+        key = self.make_key(news_data, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        _, text_path = self._paths(key)
+        stem = text_path[: -len(".txt")]
+        images = [
+            path
+            for path in glob.glob(glob.escape(stem) + ".*")
+            if not path.endswith((".txt", ".tmp"))
+        ]
+        if not images:
+            return None
+        try:
+            with open(text_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+
+        entry = CachedEdition(
+            date=key[0], content_hash=key[1], image=None, text=text, image_path=images[0]
+        )
+        self._remember(key, entry)
+        return entry
+
+    def put(
+        self,
+        news_data: Dict[str, Any],
+        variant: str,
+        image: bytes,
+        text: str,
+        ext: str = "jpg",
+    ) -> CachedEdition:
+        """写入缓存 (内存 + 磁盘)"""
+        key = self.make_key(news_data, variant)
+        entry = CachedEdition(date=key[0], content_hash=key[1], image=image, text=text)
+        self._remember(key, entry)
+
+        image_path, text_path = self._paths(key, ext)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write_atomic(image_path, image)
+            self._write_atomic(text_path, text.encode("utf-8"))
+            entry.image_path = image_path
+            self._prune_disk()
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"[每日新闻] 写入新闻缓存失败: {e}")
+        return entry
+
+    def put_file(
+        self,
+        news_data: Dict[str, Any],
+        variant: str,
+        source_path: str,
+        text: str,
+        ext: str = "jpg",
+    ) -> CachedEdition:
+        """以已有的图片文件写入缓存, 图片不读入内存
+
+        优先使用硬链接, 不支持时复制文件; 都失败时退回读取图片字节。
+        """
+        key = self.make_key(news_data, variant)
+        image_path, text_path = self._paths(key, ext)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{image_path}.tmp"
+            try:
+                os.link(source_path, tmp_path)
+            except OSError:
+                shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, image_path)
+            self._write_atomic(text_path, text.encode("utf-8"))
+            entry = CachedEdition(
+                date=key[0],
+                content_hash=key[1],
+                image=None,
+                text=text,
+                image_path=image_path,
+            )
+            self._prune_disk()
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(f"[每日新闻] 写入新闻缓存失败: {e}")
+            with open(source_path, "rb") as f:
+                image = f.read()
+            entry = CachedEdition(date=key[0], content_hash=key[1], image=image, text=text)
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: Tuple[str, str, str], entry: CachedEdition):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _prune_disk(self):
+        """磁盘上只保留最近写入的 max_entries 期"""
+        texts = glob.glob(os.path.join(self.cache_dir, "*.txt"))
+        if len(texts) <= self.max_entries:
+            return
+        texts.sort(key=os.path.getmtime)
+        for text_path in texts[: len(texts) - self.max_entries]:
+            stem = text_path[: -len(".txt")]
+            for path in glob.glob(glob.escape(stem) + ".*"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
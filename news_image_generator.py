@@ -1,11 +1,16 @@
 import os
+import time
 import datetime
 import base64
-import textwrap
-from io import BytesIO
-from typing import Optional, Dict, Any, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Optional, Dict, Any, List, Tuple, Callable
 from PIL import Image, ImageDraw, ImageFont
 from .config import CURRENT_DIR
+from .asset_store import AssetStore
+from .image_encoder import EncoderSettings, encode_image
+from .text_layout import TextBlockLayout, font_cache_key, layout_text_block
 import traceback
 
 # --- 配置常量 ---
@@ -27,6 +32,157 @@ TIP_START_Y_BELOW_NEWS = 25
 TIP_MAX_Y = 1860
 TIP_LINE_SPACING = 6
 
+FONT_NEWS_SIZE = 27
+FONT_DATE_SIZE = 20
+FONT_QUOTE_SIZE = 23
+JPEG_QUALITY = 88
+DEFAULT_ENCODER = EncoderSettings(quality=JPEG_QUALITY)
+
+# 重绘区域四周额外保留的像素, 防止抗锯齿边缘被裁掉
+DIRTY_REGION_PADDING = 2
+# 保留最近几次绘制的结果, 只有微语变化时只重绘微语区域
+RECENT_PAGES_MAX = 2
+
+# 内容超出 TIP_MAX_Y 时自动适配: 先收紧间距, 再二分查找能放下的最大字号
+AUTOFIT_LINE_SPACING = 4
+AUTOFIT_ITEM_SPACING = 8
+AUTOFIT_TIP_LINE_SPACING = 4
+AUTOFIT_MIN_NEWS_SIZE = 20
+
+# 底图与字体只加载一次, assets 目录变化时自动重新加载
+ASSET_STORE = AssetStore(BASE_IMAGE_DIR)
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass
+class FontSet:
+    """绘制新闻图片所需的字体"""
+
+    news: ImageFont.FreeTypeFont
+    date: ImageFont.FreeTypeFont
+    quote: ImageFont.FreeTypeFont
+
+
+@dataclass(frozen=True)
+class FontProfile:
+    """一套字体配置, 用于为不同社群生成不同风格的图片
+
+    字体路径可以是绝对路径, 也可以是相对 assets 目录的文件名。
+    """
+
+    name: str = "default"
+    news_font: str = FONT_NEWS_PATH
+    date_font: str = FONT_DATE_PATH
+    news_size: int = FONT_NEWS_SIZE
+    date_size: int = FONT_DATE_SIZE
+    quote_size: int = FONT_QUOTE_SIZE
+
+
+DEFAULT_FONT_PROFILE = FontProfile()
+
+
+@dataclass(frozen=True)
+class LayoutSpec:
+    """正文的字号与间距, 自动适配在这些参数上搜索"""
+
+    news_size: int = FONT_NEWS_SIZE
+    quote_size: int = FONT_QUOTE_SIZE
+    line_spacing: int = NEWS_LINE_SPACING
+    item_spacing: int = NEWS_ITEM_SPACING
+    tip_line_spacing: int = TIP_LINE_SPACING
+
+    @classmethod
+    def for_profile(cls, profile: FontProfile) -> "LayoutSpec":
+        return cls(news_size=profile.news_size, quote_size=profile.quote_size)
+
+    def compact(self) -> "LayoutSpec":
+        """收紧行距与条目间距"""
+        return replace(
+            self,
+            line_spacing=min(self.line_spacing, AUTOFIT_LINE_SPACING),
+            item_spacing=min(self.item_spacing, AUTOFIT_ITEM_SPACING),
+            tip_line_spacing=min(self.tip_line_spacing, AUTOFIT_TIP_LINE_SPACING),
+        )
+
+    def with_news_size(self, news_size: int) -> "LayoutSpec":
+        """按比例同时缩放微语字号"""
+        quote_size = max(1, round(self.quote_size * news_size / self.news_size))
+        return replace(self, news_size=news_size, quote_size=quote_size)
+
+    def profile(self, profile: FontProfile) -> FontProfile:
+        """使用本组字号的字体配置"""
+        return replace(profile, news_size=self.news_size, quote_size=self.quote_size)
+
+
+def load_fonts(
+    store: AssetStore = ASSET_STORE, profile: FontProfile = DEFAULT_FONT_PROFILE
+) -> FontSet:
+    """加载字体
+
+    :raises FileNotFoundError: 字体文件缺失
+    :raises IOError: 字体文件无法加载
+    """
+    news_path = os.path.join(BASE_IMAGE_DIR, profile.news_font)
+    date_path = os.path.join(BASE_IMAGE_DIR, profile.date_font)
+    if not os.path.exists(news_path) or not os.path.exists(date_path):
+        raise FileNotFoundError("字体文件缺失")
+    return FontSet(
+        news=store.font(news_path, profile.news_size),
+        date=store.font(date_path, profile.date_size),
+        quote=store.font(news_path, profile.quote_size),
+    )
+
+
+def warm_up_assets(
+    logger, store: AssetStore = ASSET_STORE, profile: FontProfile = DEFAULT_FONT_PROFILE
+) -> None:
+    """预先加载字体以及今明两天的底图, 缺失的资源留到绘制时再报告"""
+    try:
+        load_fonts(store, profile)
+    except IOError as e:
+        logger.warning(f"[新闻图片生成] 预热字体失败: {e}")
+    today = datetime.date.today()
+    for day in (today, today + datetime.timedelta(days=1)):
+        resolve_template(day.strftime("%a"), logger, store)
+
+
+def resolve_template(
+    day_of_week: str,
+    logger,
+    store: AssetStore = ASSET_STORE,
+    preferred: Optional[str] = None,
+) -> Optional[str]:
+    """获取底图的文件名
+
+    :param preferred: 指定的底图文件名, 不存在时按星期选择
+    :return: 星期对应的底图, 缺失时退回默认底图, 都不存在时返回 None
+    """
+    if preferred:
+        if store.shared_template(preferred) is not None:
+            return preferred
+        logger.warning(f"[新闻图片生成] 找不到指定的基础图片: {preferred}, 按星期选择")
+    base_image_filename = f"60s_{day_of_week}.jpg"
+    if store.shared_template(base_image_filename) is not None:
+        return base_image_filename
+
+    base_image_path = os.path.join(BASE_IMAGE_DIR, base_image_filename)
+    logger.warning(f"[新闻图片生成] 找不到基础图片文件: {base_image_path}")
+    if store.shared_template("60s_default.jpg") is not None:
+        default_image_path = os.path.join(BASE_IMAGE_DIR, "60s_default.jpg")
+        logger.info(f"[新闻图片生成] 使用默认基础图片: {default_image_path}")
+        return "60s_default.jpg"
+    logger.error("[新闻图片生成] 找不到默认基础图片")
+    return None
+
+
+def load_template(
+    day_of_week: str, logger, store: AssetStore = ASSET_STORE
+) -> Optional[Image.Image]:
+    """获取星期对应底图的副本, 缺失时退回默认底图"""
+    filename = resolve_template(day_of_week, logger, store)
+    return store.template(filename) if filename is not None else None
+
 
 def wrap_text_pixel(
     draw: ImageDraw.ImageDraw,
@@ -39,236 +195,551 @@ def wrap_text_pixel(
     根据像素宽度智能换行文本
     :return: (换行后的文本字符串, 文本块的总高度)
     """
-    lines = []
-    initial_words = []
-    for paragraph in text.split("\n"):
-        words_in_paragraph = []
-        current_word = ""
-        for char in paragraph:
-            if "\u4e00" <= char <= "\u9fff":
-                if current_word:
-                    words_in_paragraph.append(current_word)
-                words_in_paragraph.append(char)
-                current_word = ""
-            else:
-                current_word += char
-        if current_word:
-            words_in_paragraph.append(current_word)
-
-        processed_words = []
-        for word in words_in_paragraph:
-            if len(word) > 10 and not ("\u4e00" <= word[0] <= "\u9fff"):
-                estimated_char_width = font.size * 0.6
-                wrap_width_chars = max(1, int(max_width / estimated_char_width))
-                processed_words.extend(
-                    textwrap.wrap(
-                        word,
-                        width=wrap_width_chars,
-                        break_long_words=True,
-                        replace_whitespace=False,
-                    )
-                )
-            else:
-                processed_words.append(word)
+    layout = layout_text_block(draw, text, font, max_width, line_spacing)
+    return layout.text, layout.height
+
+
+@dataclass
+class PlacedBlock:
+    """已确定绘制位置的文本块"""
+
+    layout: TextBlockLayout
+    x: int
+    y: int
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.layout.bottom
+
+    @property
+    def box(self) -> Box:
+        """文本块墨迹在整张图片上的边界"""
+        left = self.x + self.layout.left
+        return (
+            left,
+            self.y + self.layout.top,
+            left + self.layout.width,
+            self.bottom,
+        )
 
-        initial_words.extend(processed_words)
-        initial_words.append("\n")
+    def draw(
+        self, draw: ImageDraw.ImageDraw, origin: Tuple[int, int] = (0, 0)
+    ) -> None:
+        self.layout.draw(draw, (self.x - origin[0], self.y - origin[1]), TEXT_COLOR)
 
-    initial_words.pop()
 
-    current_line = ""
-    for word in initial_words:
-        if word == "\n":
-            lines.append(current_line)
-            current_line = ""
-            continue
+@dataclass
+class NewsPageLayout:
+    """整张新闻图片的排版结果
 
-        separator = (
-            " "
-            if current_line
-            and not ("\u4e00" <= word[0] <= "\u9fff")
-            and not ("\u4e00" <= current_line[-1] <= "\u9fff")
-            else ""
-        )
-        test_line = current_line + separator + word
-        try:
-            text_width = font.getlength(test_line)
-        except AttributeError:
-            bbox = draw.textbbox((0, 0), test_line, font=font)
-            text_width = bbox[2] - bbox[0]
+    绘制前一次性算出每条新闻和微语的位置与高度, 并记录越界信息,
+    便于在绘制之前决定缩小字号或分页。
+    """
 
-        if text_width <= max_width:
-            current_line = test_line
+    items: List[PlacedBlock] = field(default_factory=list)
+    tip: Optional[PlacedBlock] = None
+    news_bottom: int = NEWS_START_Y  # 最后一条新闻的底边 (不含条目间距)
+    first_overflow_item: Optional[int] = None  # 第一个导致越界的新闻序号 (从 1 开始)
+    tip_skipped: bool = False  # 微语起点已越界, 不绘制
+
+    @property
+    def bottom(self) -> int:
+        if self.tip is not None:
+            return max(self.news_bottom, self.tip.bottom)
+        return self.news_bottom
+
+    @property
+    def overflow(self) -> bool:
+        return self.bottom > TIP_MAX_Y
+
+    @property
+    def visible_tip(self) -> Optional[PlacedBlock]:
+        """实际会绘制的微语 (没有微语或已越界时为 None)"""
+        if self.tip is None or self.tip_skipped or not self.tip.layout.lines:
+            return None
+        return self.tip
+
+    def draw(
+        self, draw: ImageDraw.ImageDraw, origin: Tuple[int, int] = (0, 0)
+    ) -> None:
+        """绘制所有文本块, origin 为画布左上角在整张图片上的位置"""
+        for block in self.items:
+            block.draw(draw, origin)
+        self.draw_tip(draw, origin)
+
+    def draw_tip(
+        self, draw: ImageDraw.ImageDraw, origin: Tuple[int, int] = (0, 0)
+    ) -> None:
+        if self.visible_tip is not None:
+            self.tip.draw(draw, origin)
+
+    def dirty_box(self) -> Optional[Box]:
+        """所有文本块墨迹的并集, 即需要重绘的区域"""
+        blocks = list(self.items)
+        if self.visible_tip is not None:
+            blocks.append(self.tip)
+        return union_boxes(block.box for block in blocks)
+
+
+def union_boxes(boxes) -> Optional[Box]:
+    """多个区域的外接矩形, 没有区域时返回 None"""
+    result = None
+    for box in boxes:
+        if result is None:
+            result = box
         else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
-            try:
-                text_width = font.getlength(current_line)
-            except AttributeError:
-                bbox = draw.textbbox((0, 0), current_line, font=font)
-                text_width = bbox[2] - bbox[0]
-
-            while text_width > max_width and len(current_line) > 1:
-                current_line = current_line[:-1]
-                try:
-                    text_width = font.getlength(current_line)
-                except AttributeError:
-                    bbox = draw.textbbox((0, 0), current_line, font=font)
-                    text_width = bbox[2] - bbox[0]
-
-    if current_line:
-        lines.append(current_line)
-
-    final_text = "\n".join(lines)
-    if not final_text:
-        return "", 0
-
-    bbox_multi = draw.multiline_textbbox(
-        (0, 0), final_text, font=font, spacing=line_spacing
-    )
-    actual_height = bbox_multi[3] - bbox_multi[1]
+            result = (
+                min(result[0], box[0]),
+                min(result[1], box[1]),
+                max(result[2], box[2]),
+                max(result[3], box[3]),
+            )
+    return result
 
-    return final_text, actual_height
 
+def clip_box(box: Box, size: Tuple[int, int], top: int = 0) -> Optional[Box]:
+    """向外扩展 DIRTY_REGION_PADDING 并裁剪到图片范围内, 区域为空时返回 None"""
+    pad = DIRTY_REGION_PADDING
+    left = max(0, box[0] - pad)
+    upper = max(top, box[1] - pad)
+    right = min(size[0], box[2] + pad)
+    lower = min(size[1], box[3] + pad)
+    if left >= right or upper >= lower:
+        return None
+    return left, upper, right, lower
 
-def create_news_image_from_data(news_api_data: Dict[str, Any], logger) -> Optional[str]:
-    try:
-        date_str = news_api_data.get("date")
-        news_list = news_api_data.get("news", [])
-        tip = news_api_data.get("tip", "")
 
-        if not date_str or not news_list:
-            logger.error("[新闻图片生成] 缺少必要的新闻数据或日期")
-            return None
+def repaint_region(
+    image: Image.Image,
+    background: Image.Image,
+    box: Box,
+    paint: Callable[[ImageDraw.ImageDraw, Tuple[int, int]], None],
+) -> None:
+    """只重绘 image 的 box 区域
 
-        try:
-            news_date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
-            year_str = news_date.strftime("%Y年")
-            month_str = news_date.strftime("%m月")
-            day_str = news_date.strftime("%d日")
-            day_of_week = news_date.strftime("%a")
-        except ValueError as e:
-            logger.error(f"[新闻图片生成] 日期格式错误: {e}")
-            return None
+    从背景中裁剪出该区域作为画布, 在画布上绘制 (坐标按画布原点平移) 后贴回 image,
+    区域外的像素保持不变。
+    """
+    canvas = background.crop(box)
+    paint(ImageDraw.Draw(canvas), (box[0], box[1]))
+    image.paste(canvas, box[:2])
 
-        base_image_filename = f"60s_{day_of_week}.jpg"
-        base_image_path = os.path.join(BASE_IMAGE_DIR, base_image_filename)
-
-        if not os.path.exists(base_image_path):
-            logger.warning(f"[新闻图片生成] 找不到基础图片文件: {base_image_path}")
-            default_image_path = os.path.join(BASE_IMAGE_DIR, "60s_default.jpg")
-            if os.path.exists(default_image_path):
-                base_image_path = default_image_path
-                logger.info(f"[新闻图片生成] 使用默认基础图片: {default_image_path}")
-            else:
-                logger.error("[新闻图片生成] 找不到默认基础图片")
-                return None
-
-        image = Image.open(base_image_path).convert("RGB")
-        width, height = image.size
-        draw = ImageDraw.Draw(image)
-
-        if not os.path.exists(FONT_NEWS_PATH) or not os.path.exists(FONT_DATE_PATH):
-            logger.error("[新闻图片生成] 字体文件缺失")
-            return None
 
-        try:
-            font_news = ImageFont.truetype(FONT_NEWS_PATH, 27)
-            font_date = ImageFont.truetype(FONT_DATE_PATH, 20)
-            font_quote = ImageFont.truetype(FONT_NEWS_PATH, 23)
-        except IOError as e:
-            logger.error(f"[新闻图片生成] 加载字体文件失败: {e}")
-            return None
+def layout_news_page(
+    draw: ImageDraw.ImageDraw,
+    news_list: List[str],
+    tip: str,
+    font_news: ImageFont.FreeTypeFont,
+    font_quote: ImageFont.FreeTypeFont,
+    width: int,
+    spec: LayoutSpec = LayoutSpec(),
+) -> NewsPageLayout:
+    """计算新闻条目与微语的排版 (不绘制)"""
+    page = NewsPageLayout()
+    max_news_width = width - 2 * MARGIN_X
+    current_y = NEWS_START_Y
+
+    for i, item in enumerate(news_list):
+        item = item.strip()
+        numbered_item = f"{i + 1}. {item}"
+
+        layout = layout_text_block(
+            draw, numbered_item, font_news, max_news_width, spec.line_spacing
+        )
+        if not layout.lines:
+            continue
+
+        page.items.append(PlacedBlock(layout=layout, x=MARGIN_X, y=current_y))
+        current_y += layout.height + spec.item_spacing
 
-        draw.text(DATE_YEAR_POS, year_str, fill=TEXT_COLOR, font=font_date)
-        month_day_str = f"{month_str}{day_str}"
-        month_day_bbox = draw.textbbox((0, 0), month_day_str, font=font_date)
-        month_day_width = month_day_bbox[2] - month_day_bbox[0]
-        month_day_x = width - month_day_width - DATE_MD_RIGHT_MARGIN
-        draw.text(
-            (month_day_x, DATE_MD_Y), month_day_str, fill=TEXT_COLOR, font=font_date
+        if current_y > TIP_MAX_Y and page.first_overflow_item is None:
+            page.first_overflow_item = i + 1
+
+    page.news_bottom = current_y - spec.item_spacing
+    return layout_tip(draw, page, tip, font_quote, width, spec.tip_line_spacing)
+
+
+def layout_tip(
+    draw: ImageDraw.ImageDraw,
+    page: NewsPageLayout,
+    tip: str,
+    font_quote: ImageFont.FreeTypeFont,
+    width: int,
+    line_spacing: int = TIP_LINE_SPACING,
+) -> NewsPageLayout:
+    """在新闻条目下方排版微语, 返回替换了微语的新排版 (不修改 page)"""
+    if not tip:
+        return replace(page, tip=None, tip_skipped=False)
+
+    tip_full_text = f"【微语】{tip.strip()}"
+    max_tip_width = width - 2 * MARGIN_X
+    layout = layout_text_block(
+        draw, tip_full_text, font_quote, max_tip_width, line_spacing
+    )
+    tip_start_y = page.news_bottom + TIP_START_Y_BELOW_NEWS
+    return replace(
+        page,
+        tip=PlacedBlock(layout=layout, x=MARGIN_X, y=tip_start_y),
+        tip_skipped=tip_start_y >= TIP_MAX_Y,
+    )
+
+
+@dataclass
+class FittedPage:
+    """自动适配的结果"""
+
+    page: NewsPageLayout
+    fonts: FontSet
+    spec: LayoutSpec
+
+    @property
+    def fits(self) -> bool:
+        return not self.page.overflow
+
+
+def fit_page(
+    draw: ImageDraw.ImageDraw,
+    news_list: List[str],
+    tip: str,
+    profile: FontProfile,
+    width: int,
+    store: AssetStore = ASSET_STORE,
+) -> FittedPage:
+    """找出能在 TIP_MAX_Y 之内放下全部新闻与微语的最大排版
+
+    依次尝试: 原始字号与间距; 收紧间距; 在收紧间距的基础上二分查找最大字号
+    (不小于 AUTOFIT_MIN_NEWS_SIZE)。内容不越界时只排版一次, 越界时通常再排版四五次,
+    每个字号的字体与字符宽度缓存会被之后的绘制复用。
+
+    :return: 适配结果, 最小字号仍放不下时返回最小字号的排版 (fits 为 False)
+    """
+
+    def attempt(spec: LayoutSpec) -> FittedPage:
+        fonts = load_fonts(store, spec.profile(profile))
+        page = layout_news_page(
+            draw, news_list, tip, fonts.news, fonts.quote, width, spec
         )
+        return FittedPage(page=page, fonts=fonts, spec=spec)
+
+    base = LayoutSpec.for_profile(profile)
+    fitted = attempt(base)
+    if fitted.fits:
+        return fitted
+    compact = base.compact()
+    fitted = attempt(compact)
+    if fitted.fits:
+        return fitted
+
+    # 字号越小, 排版越矮: 二分查找放得下的最大字号
+    best = None
+    low, high = min(AUTOFIT_MIN_NEWS_SIZE, base.news_size - 1), base.news_size - 1
+    while low <= high:
+        size = (low + high) // 2
+        candidate = attempt(compact.with_news_size(size))
+        if candidate.fits:
+            best = candidate
+            low = size + 1
+        else:
+            fitted = candidate
+            high = size - 1
+    return best or fitted
 
-        max_news_width = width - 2 * MARGIN_X
-        current_y = NEWS_START_Y
 
-        for i, item in enumerate(news_list):
-            item = item.strip()
-            numbered_item = f"{i + 1}. {item}"
+def paginate_news(
+    draw: ImageDraw.ImageDraw,
+    news_list: List[str],
+    tip: str,
+    fonts: FontSet,
+    width: int,
+    spec: LayoutSpec = LayoutSpec(),
+) -> List[NewsPageLayout]:
+    """按 TIP_MAX_Y 将新闻分成多页, 编号连续; 微语放在最后一页, 放不下时单独成页"""
+    max_news_width = width - 2 * MARGIN_X
+    pages = [NewsPageLayout()]
+    current_y = NEWS_START_Y
+
+    for i, item in enumerate(news_list):
+        layout = layout_text_block(
+            draw, f"{i + 1}. {item.strip()}", fonts.news, max_news_width, spec.line_spacing
+        )
+        if not layout.lines:
+            continue
+        page = pages[-1]
+        if page.items and current_y + layout.height > TIP_MAX_Y:
+            page.news_bottom = current_y - spec.item_spacing
+            page = NewsPageLayout()
+            pages.append(page)
+            current_y = NEWS_START_Y
+
+        page.items.append(PlacedBlock(layout=layout, x=MARGIN_X, y=current_y))
+        current_y += layout.height + spec.item_spacing
+        if current_y > TIP_MAX_Y and page.first_overflow_item is None:
+            # 单条新闻就超过一页
+            page.first_overflow_item = i + 1
+    pages[-1].news_bottom = current_y - spec.item_spacing
+
+    last = layout_tip(draw, pages[-1], tip, fonts.quote, width, spec.tip_line_spacing)
+    if last.overflow and pages[-1].items and last.first_overflow_item is None:
+        tip_page = NewsPageLayout(news_bottom=NEWS_START_Y - TIP_START_Y_BELOW_NEWS)
+        pages.append(
+            layout_tip(draw, tip_page, tip, fonts.quote, width, spec.tip_line_spacing)
+        )
+    else:
+        pages[-1] = last
+    return pages
+
 
-            wrapped_item, _ = wrap_text_pixel(
-                draw, numbered_item, font_news, max_news_width, NEWS_LINE_SPACING
+def draw_date(
+    draw: ImageDraw.ImageDraw,
+    width: int,
+    news_date: datetime.datetime,
+    font_date: ImageFont.FreeTypeFont,
+) -> None:
+    """绘制右上角的年份与月日"""
+    year_str = news_date.strftime("%Y年")
+    month_day_str = f"{news_date.strftime('%m月')}{news_date.strftime('%d日')}"
+    draw.text(DATE_YEAR_POS, year_str, fill=TEXT_COLOR, font=font_date)
+    month_day_bbox = draw.textbbox((0, 0), month_day_str, font=font_date)
+    month_day_width = month_day_bbox[2] - month_day_bbox[0]
+    month_day_x = width - month_day_width - DATE_MD_RIGHT_MARGIN
+    draw.text((month_day_x, DATE_MD_Y), month_day_str, fill=TEXT_COLOR, font=font_date)
+
+
+def log_page_overflow(page: NewsPageLayout, logger) -> None:
+    """记录排版越界的警告"""
+    if page.first_overflow_item is not None:
+        logger.warning(
+            f"[新闻图片生成] 警告: 新闻内容将越界, 位于: {page.first_overflow_item}."
+        )
+    if page.tip is not None:
+        if page.tip.bottom > TIP_MAX_Y:
+            logger.warning(
+                f"[新闻图片生成] 警告: Tip可能越界 底边位于: {page.tip.bottom}, 最大值: {TIP_MAX_Y}."
+            )
+        if page.tip_skipped:
+            logger.warning(
+                f"[新闻图片生成] 跳过Tip绘制因为达到最大y值 ({page.tip.y})."
             )
 
-            if not wrapped_item:
-                continue
 
-            draw.text(
-                (MARGIN_X, current_y),
-                wrapped_item,
-                fill=TEXT_COLOR,
-                font=font_news,
-                spacing=NEWS_LINE_SPACING,
-            )
+@dataclass
+class RenderedPage:
+    """一次绘制的结果, 保留排版以便只重绘变化的区域"""
 
-            item_bbox = draw.multiline_textbbox(
-                (MARGIN_X, current_y),
-                wrapped_item,
-                font=font_news,
-                spacing=NEWS_LINE_SPACING,
-            )
-            item_height = item_bbox[3] - item_bbox[1]
+    image: Image.Image
+    page: NewsPageLayout
+    tip: str
+    spec: LayoutSpec = LayoutSpec()
 
-            current_y += item_height + NEWS_ITEM_SPACING
 
-            if current_y > TIP_MAX_Y:
-                logger.warning(f"[新闻图片生成] 警告: 新闻内容将越界, 位于: {i+1}.")
+_recent_pages: "OrderedDict[Tuple, RenderedPage]" = OrderedDict()
+_recent_pages_lock = threading.Lock()
+_measure_local = threading.local()
 
-        last_news_bottom_y = current_y - NEWS_ITEM_SPACING
 
-        if tip:
-            tip_full_text = f"【微语】{tip.strip()}"
-            max_tip_width = width - 2 * MARGIN_X
-            wrapped_tip, _ = wrap_text_pixel(
-                draw, tip_full_text, font_quote, max_tip_width, TIP_LINE_SPACING
-            )
+def _measure_draw() -> ImageDraw.ImageDraw:
+    """当前线程用于测量文本的绘图对象 (测量结果与画布大小无关)"""
+    draw = getattr(_measure_local, "draw", None)
+    if draw is None:
+        draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        _measure_local.draw = draw
+    return draw
 
-            tip_start_y = last_news_bottom_y + TIP_START_Y_BELOW_NEWS
 
-            tip_render_bbox = draw.multiline_textbbox(
-                (MARGIN_X, tip_start_y),
-                wrapped_tip,
-                font=font_quote,
-                spacing=TIP_LINE_SPACING,
-            )
+def dated_template(
+    filename: str,
+    news_date: datetime.datetime,
+    font_date: ImageFont.FreeTypeFont,
+    store: AssetStore = ASSET_STORE,
+) -> Optional[Image.Image]:
+    """获取已绘制好日期的共享底图 (只读), 同一底图同一日期只绘制一次"""
 
-            if tip_render_bbox[3] > TIP_MAX_Y:
-                logger.warning(
-                    f"[新闻图片生成] 警告: Tip可能越界 底边位于: {tip_render_bbox[3]}, 最大值: {TIP_MAX_Y}."
-                )
+    def build(image: Image.Image) -> Image.Image:
+        draw_date(ImageDraw.Draw(image), image.width, news_date, font_date)
+        return image
 
-            if tip_start_y < TIP_MAX_Y:
-                draw.text(
-                    (MARGIN_X, tip_start_y),
-                    wrapped_tip,
-                    fill=TEXT_COLOR,
-                    font=font_quote,
-                    spacing=TIP_LINE_SPACING,
-                )
-            else:
-                logger.warning(
-                    f"[新闻图片生成] 跳过Tip绘制因为达到最大y值 ({tip_start_y})."
-                )
+    key = ("date", news_date.date(), font_cache_key(font_date))
+    return store.derived(filename, key, build)
+
+
+def paint_page(background: Image.Image, page: NewsPageLayout) -> Image.Image:
+    """在底图副本上绘制排版好的一页, 只在文本所在区域的裁剪画布上绘制"""
+    image = background.copy()
+    box = page.dirty_box()
+    if box is not None:
+        box = clip_box(box, image.size)
+    if box is not None:
+        repaint_region(image, background, box, page.draw)
+    return image
 
-        img_byte_arr = BytesIO()
-        image.save(img_byte_arr, format="JPEG", quality=88)
-        img_bytes = img_byte_arr.getvalue()
 
-        # 转换为 Base64 编码
-        base64_data = base64.b64encode(img_bytes).decode("utf-8")
-        logger.info("[新闻图片生成] 新闻图片生成成功")
-        return base64_data
+def render_full_page(
+    background: Image.Image,
+    news_list: List[str],
+    tip: str,
+    fonts: FontSet,
+    spec: LayoutSpec = LayoutSpec(),
+    page: Optional[NewsPageLayout] = None,
+) -> RenderedPage:
+    """在预合成底图上绘制全部新闻
+
+    :param page: 已计算好的排版 (如自动适配的结果), 为 None 时按 spec 排版
+    """
+    if page is None:
+        page = layout_news_page(
+            _measure_draw(), news_list, tip, fonts.news, fonts.quote, background.width, spec
+        )
+    return RenderedPage(image=paint_page(background, page), page=page, tip=tip, spec=spec)
+
+
+def render_tip_only(
+    previous: RenderedPage,
+    background: Image.Image,
+    tip: str,
+    font_quote: ImageFont.FreeTypeFont,
+) -> RenderedPage:
+    """新闻条目不变、只有微语变化时, 只重绘新旧微语覆盖的区域"""
+    if tip == previous.tip:
+        return previous
+    page = layout_tip(
+        _measure_draw(),
+        previous.page,
+        tip,
+        font_quote,
+        background.width,
+        previous.spec.tip_line_spacing,
+    )
+    image = previous.image.copy()
+
+    box = union_boxes(
+        block.box
+        for block in (previous.page.visible_tip, page.visible_tip)
+        if block is not None
+    )
+    if box is not None:
+        # 只擦除新闻条目下方的区域, 避免把新闻文字恢复成底图
+        news_bottom = max((block.box[3] for block in page.items), default=0)
+        box = clip_box(box, image.size, top=news_bottom)
+    if box is not None:
+        repaint_region(image, background, box, page.draw_tip)
+    return RenderedPage(image=image, page=page, tip=tip, spec=previous.spec)
+
+
+@dataclass
+class RenderInput:
+    """绘制前准备好的数据: 新闻内容、已合成日期的底图与字体"""
+
+    filename: str
+    date: str
+    news_list: List[str]
+    tip: str
+    background: Image.Image
+    fonts: FontSet
+
+
+def prepare_render(
+    news_api_data: Dict[str, Any],
+    logger,
+    template: Optional[str] = None,
+    profile: FontProfile = DEFAULT_FONT_PROFILE,
+) -> Optional[RenderInput]:
+    """校验新闻数据并准备底图与字体, 失败时记录日志并返回 None"""
+    date_str = news_api_data.get("date")
+    news_list = news_api_data.get("news", [])
+    tip = news_api_data.get("tip", "")
+
+    if not date_str or not news_list:
+        logger.error("[新闻图片生成] 缺少必要的新闻数据或日期")
+        return None
+
+    try:
+        news_date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError as e:
+        logger.error(f"[新闻图片生成] 日期格式错误: {e}")
+        return None
+
+    filename = resolve_template(news_date.strftime("%a"), logger, preferred=template)
+    if filename is None:
+        return None
+
+    try:
+        fonts = load_fonts(profile=profile)
+    except FileNotFoundError:
+        logger.error("[新闻图片生成] 字体文件缺失")
+        return None
+    except IOError as e:
+        logger.error(f"[新闻图片生成] 加载字体文件失败: {e}")
+        return None
+
+    background = dated_template(filename, news_date, fonts.date)
+    if background is None:
+        return None
+    return RenderInput(filename, date_str, news_list, tip, background, fonts)
+
+
+def render_news_image(
+    news_api_data: Dict[str, Any],
+    logger,
+    incremental: bool = True,
+    template: Optional[str] = None,
+    profile: FontProfile = DEFAULT_FONT_PROFILE,
+) -> Optional[Image.Image]:
+    """
+    根据新闻数据绘制新闻图片 (不编码)
+
+    日期预先合成到共享底图上, 每次只重绘文本所在的区域;
+    与最近一次绘制相比只有微语变化时, 只重绘微语区域。
+    返回的图片会被缓存用于增量重绘, 调用方不应修改它。
+    内容超出 TIP_MAX_Y 时自动收紧间距、缩小字号 (见 fit_page)。
+    :param incremental: 是否复用最近一次绘制的结果, 为 False 时总是完整绘制
+    :param template: 指定底图文件名, 默认按星期选择
+    :param profile: 字体配置
+    :return: 绘制好的 RGB 图片, 失败时返回 None
+    """
+    try:
+        prepared = prepare_render(news_api_data, logger, template, profile)
+        if prepared is None:
+            return None
+        background, tip = prepared.background, prepared.tip
+
+        page_key = (
+            prepared.filename,
+            profile,
+            prepared.date,
+            tuple(prepared.news_list),
+            ASSET_STORE.generation,
+        )
+        with _recent_pages_lock:
+            previous = _recent_pages.get(page_key) if incremental else None
+
+        rendered = None
+        base_spec = LayoutSpec.for_profile(profile)
+        if previous is not None and previous.spec == base_spec:
+            # 原始排版下新的微语仍放得下时, 结果与自动适配的完整绘制一致
+            candidate = render_tip_only(previous, background, tip, prepared.fonts.quote)
+            if not candidate.page.overflow:
+                logger.debug("[新闻图片生成] 新闻条目未变化, 只重绘微语区域")
+                rendered = candidate
+        if rendered is None:
+            fitted = fit_page(
+                _measure_draw(), prepared.news_list, tip, profile, background.width
+            )
+            if fitted.spec != base_spec:
+                logger.info(
+                    f"[新闻图片生成] 内容较多, 自动调整排版: 字号 {fitted.spec.news_size}, "
+                    f"行距 {fitted.spec.line_spacing}, 条目间距 {fitted.spec.item_spacing}"
+                )
+            rendered = render_full_page(
+                background, prepared.news_list, tip, fitted.fonts, fitted.spec, fitted.page
+            )
+        log_page_overflow(rendered.page, logger)
+
+        with _recent_pages_lock:
+            _recent_pages[page_key] = rendered
+            _recent_pages.move_to_end(page_key)
+            while len(_recent_pages) > RECENT_PAGES_MAX:
+                _recent_pages.popitem(last=False)
+        return rendered.image
 
     except FileNotFoundError as e:
         logger.error(f"[新闻图片生成] 文件未找到: {e}")
@@ -279,6 +750,155 @@ def create_news_image_from_data(news_api_data: Dict[str, Any], logger) -> Option
         return None
 
 
+def template_key(news_api_data: Dict[str, Any]) -> str:
+    """新闻所用底图的标识, 编码器按底图缓存选定的质量"""
+    try:
+        news_date = datetime.datetime.strptime(news_api_data.get("date", ""), "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return "default"
+    return news_date.strftime("%a")
+
+
+def encode_news_image(
+    image: Image.Image,
+    settings: EncoderSettings = DEFAULT_ENCODER,
+    template: str = "",
+    logger=None,
+) -> bytes:
+    """按编码参数编码新闻图片 (默认为 JPEG)"""
+    result = encode_image(image, settings, template)
+    if logger is not None and settings.max_bytes:
+        if result.fits_budget:
+            logger.debug(
+                f"[新闻图片生成] 编码为 {result.format} 质量 {result.quality}, "
+                f"大小 {len(result.data)} 字节"
+            )
+        else:
+            logger.warning(
+                f"[新闻图片生成] 最低质量下图片仍超出体积上限: "
+                f"{len(result.data)} > {settings.max_bytes} 字节"
+            )
+    return result.data
+
+
+def render_news_image_timed(
+    news_api_data: Dict[str, Any],
+    logger,
+    settings: EncoderSettings = DEFAULT_ENCODER,
+    template: Optional[str] = None,
+    profile: FontProfile = DEFAULT_FONT_PROFILE,
+) -> Tuple[Optional[bytes], Dict[str, float]]:
+    """
+    根据新闻数据绘制新闻图片, 并分别统计绘制与编码耗时
+    :param settings: 编码参数
+    :param template: 指定底图文件名, 默认按星期选择
+    :param profile: 字体配置
+    :return: (图片字节, 失败时为 None; {"draw": 秒, "encode": 秒})
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    image = render_news_image(
+        news_api_data, logger, template=template, profile=profile
+    )
+    timings["draw"] = time.perf_counter() - start
+    if image is None:
+        return None, timings
+    start = time.perf_counter()
+    try:
+        img_bytes = encode_news_image(
+            image, settings, template or template_key(news_api_data), logger
+        )
+    except Exception as e:
+        logger.error(f"[新闻图片生成] 图片编码失败: {e}")
+        traceback.print_exc()
+        return None, timings
+    timings["encode"] = time.perf_counter() - start
+    logger.info("[新闻图片生成] 新闻图片生成成功")
+    return img_bytes, timings
+
+
+def render_news_pages(
+    news_api_data: Dict[str, Any],
+    logger,
+    template: Optional[str] = None,
+    profile: FontProfile = DEFAULT_FONT_PROFILE,
+) -> List[Image.Image]:
+    """
+    根据新闻数据绘制新闻图片, 内容超出 TIP_MAX_Y 时保持字号不变, 分页绘制为多张图片
+    (自动缩小字号的替代方案, 适合批量绘制)
+    :return: 每一页的图片, 失败时返回空列表
+    """
+    try:
+        prepared = prepare_render(news_api_data, logger, template, profile)
+        if prepared is None:
+            return []
+        spec = LayoutSpec.for_profile(profile)
+        pages = paginate_news(
+            _measure_draw(),
+            prepared.news_list,
+            prepared.tip,
+            prepared.fonts,
+            prepared.background.width,
+            spec,
+        )
+        if len(pages) > 1:
+            logger.info(f"[新闻图片生成] 内容较多, 分为 {len(pages)} 页绘制")
+        for page in pages:
+            log_page_overflow(page, logger)
+        return [paint_page(prepared.background, page) for page in pages]
+    except Exception as e:
+        logger.error(f"[新闻图片生成] 未知错误: {e}")
+        traceback.print_exc()
+        return []
+
+
+def render_news_pages_timed(
+    news_api_data: Dict[str, Any],
+    logger,
+    settings: EncoderSettings = DEFAULT_ENCODER,
+    template: Optional[str] = None,
+    profile: FontProfile = DEFAULT_FONT_PROFILE,
+) -> Tuple[List[bytes], Dict[str, float]]:
+    """
+    分页绘制并编码新闻图片, 同时统计绘制与编码耗时
+    :return: (每一页的图片字节, 失败时为空列表; {"draw": 秒, "encode": 秒})
+    """
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    images = render_news_pages(news_api_data, logger, template, profile)
+    timings["draw"] = time.perf_counter() - start
+    start = time.perf_counter()
+    key = template or template_key(news_api_data)
+    try:
+        pages = [encode_news_image(image, settings, key, logger) for image in images]
+    except Exception as e:
+        logger.error(f"[新闻图片生成] 图片编码失败: {e}")
+        traceback.print_exc()
+        return [], timings
+    timings["encode"] = time.perf_counter() - start
+    return pages, timings
+
+
+def render_news_image_bytes(news_api_data: Dict[str, Any], logger) -> Optional[bytes]:
+    """
+    根据新闻数据绘制新闻图片
+    :return: JPEG 图片字节, 失败时返回 None
+    """
+    return render_news_image_timed(news_api_data, logger)[0]
+
+
+def create_news_image_from_data(news_api_data: Dict[str, Any], logger) -> Optional[str]:
+    """
+    根据新闻数据绘制新闻图片
+    :return: 图片的 Base64 编码, 失败时返回 None
+    """
+    img_bytes = render_news_image_bytes(news_api_data, logger)
+    if img_bytes is None:
+        return None
+    # 转换为 Base64 编码
+    return base64.b64encode(img_bytes).decode("utf-8")
+
+
 if __name__ == "__main__":
     import logging
 
@@ -286,28 +906,7 @@ if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     logger = logging.getLogger("news_image_generator")
 
-    # 示例数据
-    example_api_data = {
-        "date": "2025-05-13",
-        "news": [
-            "中国天气网：北方升温模式持续，预计16日起将出现大面积高温天气，局地最高气温或达40°C",
-            "西藏拉孜12日发生5.5级地震：震感明显，无人员伤亡；腾讯宣布：微信、QQ地震预警功能正式覆盖至全国，iOS待解锁",
-            "教育部基础教育教指委：小学阶段禁止学生独自使用开放式内容生成功能",
-            "国内首例侵入式脑机接口系统前瞻性临床试验：受试者已能用意念玩赛车游戏，产品预计2028年上市",
-            "江西吉水县一00后自愿入伍后拒服兵役，官方通报：不得考公，两年内经商、升学等受限",
-            "民企老板被错羁212天：申请国赔千万余元，要求恢复名誉赔礼道歉",
-            "湖南长沙县一出租房疑存非法代孕手术室实验室？官方通报：查封涉事场所，相关人员被控制",
-            "沈阳一超市疑借领养名义烹食流浪狗，市监局回应：已收到多起投诉",
-            "台媒：台当局将96%汉人改成“其余人口”，被痛批干脆改成火星来的",
-            "中美日内瓦经贸会谈联合声明发布：双方同意相互取消91%的关税，暂停90天24%关税，并继续协商解决彼此关切",
-            "美媒：特朗普将签署行政令，强制执行“最惠国”药价令，美国药价或将狂降30%至80%",
-            "美媒：特朗普拟接受卡塔尔赠送豪华飞机，替换40年机龄的空军一号，价值4亿美元或为该国史上最贵礼物，白宫前顾问称收外国所赠专机或违宪",
-            "西媒：西班牙一城市工厂发生火灾致有毒气体氯气泄漏，当局要求受影响的5个城市超过16万居民居家 “隔离”",
-            "英媒：英国首相宣布永久居留权的最低居住年限将从5年延长至10年；英国首相住所起火，无人伤亡，警方紧急调查情况",
-            "外媒：库尔德工人党宣布解散并结束武装活动，土耳其40年内乱结束；泽连斯基称将前往土耳其与普京会面，乌克兰已做好与俄会谈准备",
-        ],
-        "tip": "现实和理想之间，不变的是跋涉，暗淡与辉煌之间，不变的是开拓。这是一个比较长的例子，用来测试换行和是否会超出边界。",
-    }
+    from .fixtures import EXAMPLE_API_DATA as example_api_data
 
     # 调用新闻图片生成函数
     logger.info("[测试] 开始生成新闻图片...")
@@ -0,0 +1,321 @@
+import re
+import time
+import asyncio
+import datetime
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .http_client import HttpClient
+
+STRATEGY_FIRST = "first"  # 采用最先返回的有效结果
+STRATEGY_MERGE = "merge"  # 合并所有来源的新闻条目并去重
+
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+# 条目开头的编号, 如 "1. " "2、"; 点号后须有空白, 以免把 "3.15晚会" "5.5级地震" 当成编号
+ITEM_NUMBER_PATTERN = re.compile(r"^\s*\d+\s*(?:[.．]\s+|[、)）]\s*)")
+
+# 两条新闻的字符二元组 Jaccard 相似度达到该值时视为同一条新闻
+DEFAULT_SIMILARITY = 0.6
+# 合并后最多保留的条目数
+MERGE_MAX_ITEMS = 20
+# 延迟的指数加权平均系数
+LATENCY_ALPHA = 0.3
+
+
+class SourceError(Exception):
+    """新闻源返回的数据无效, 或所有新闻源都不可用"""
+
+
+@dataclass
+class SourceStats:
+    """单个新闻源的请求统计"""
+
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    latency: Optional[float] = None  # 成功请求耗时的指数加权平均 (秒)
+    last_error: str = ""
+    last_date: str = ""  # 最近一次返回的新闻日期
+
+    def record_success(self, seconds: float, date: str):
+        self.requests += 1
+        self.successes += 1
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += LATENCY_ALPHA * (seconds - self.latency)
+        self.last_date = date
+
+    def record_failure(self, error: str):
+        self.requests += 1
+        self.failures += 1
+        self.last_error = error
+
+    @property
+    def success_rate(self) -> float:
+        # 平滑处理, 没有记录时视为 50%
+        return (self.successes + 1) / (self.requests + 2)
+
+    def score(self) -> float:
+        """越小越优先: 平均延迟 / 成功率"""
+        return (self.latency if self.latency is not None else 1.0) / self.success_rate
+
+
+@dataclass
+class NewsSource:
+    """一个返回 {date, news, tip, image} 结构的 JSON 新闻接口"""
+
+    name: str
+    url: str
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    stats: SourceStats = field(default_factory=SourceStats)
+
+
+def parse_sources(entries, default_url: str, **breaker_options) -> List[NewsSource]:
+    """解析新闻源配置, 格式为 "名称|URL" 或仅 URL; 未配置时使用默认接口"""
+    sources = []
+    for entry in entries or []:
+        name, _, url = str(entry).strip().rpartition("|")
+        url = url.strip()
+        if not url:
+            continue
+        name = name.strip() or url
+        if any(source.name == name for source in sources):
+            continue
+        sources.append(NewsSource(name, url, CircuitBreaker(**breaker_options)))
+    if not sources:
+        sources.append(NewsSource("default", default_url, CircuitBreaker(**breaker_options)))
+    return sources
+
+
+def validate_news(payload: Any) -> Dict[str, Any]:
+    """校验并规整接口返回的数据, 兼容直接返回与包在 {"data": ...} 中两种形式
+
+    :raises SourceError: 数据不完整或格式错误
+    """
+    if isinstance(payload, dict) and isinstance(payload.get("data"), dict):
+        payload = payload["data"]
+    if not isinstance(payload, dict):
+        raise SourceError("返回的数据不是对象")
+    date = payload.get("date")
+    if not isinstance(date, str) or not DATE_PATTERN.fullmatch(date):
+        raise SourceError(f"日期格式错误: {date!r}")
+    news = payload.get("news")
+    if not isinstance(news, list):
+        raise SourceError("缺少新闻列表")
+    items = [item.strip() for item in news if isinstance(item, str) and item.strip()]
+    if not items:
+        raise SourceError("新闻列表为空")
+    data = dict(payload)
+    data["news"] = items
+    data["tip"] = payload.get("tip") if isinstance(payload.get("tip"), str) else ""
+    data["image"] = payload.get("image") if isinstance(payload.get("image"), str) else ""
+    return data
+
+
+def normalize_item(text: str) -> str:
+    """去掉编号、标点与空白并统一全半角/大小写, 用于比较新闻条目"""
+    text = ITEM_NUMBER_PATTERN.sub("", unicodedata.normalize("NFKC", text))
+    return "".join(char for char in text.lower() if char.isalnum())
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """字符 n 元组集合, 文本短于 n 时为文本本身"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard 相似度"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def merge_news(
+    lists: List[List[str]],
+    threshold: float = DEFAULT_SIMILARITY,
+    max_items: int = MERGE_MAX_ITEMS,
+) -> List[str]:
+    """按来源优先级合并多个新闻列表, 跳过重复与近似重复的条目
+
+    规整后完全相同的条目按哈希直接跳过, 其余条目与已保留条目比较字符二元组的相似度。
+    编号只在比较时去掉, 保留的条目为原文。
+    """
+    merged: List[str] = []
+    seen: Set[str] = set()
+    kept: List[Set[str]] = []
+    for items in lists:
+        for item in items:
+            if len(merged) >= max_items:
+                return merged
+            key = normalize_item(item)
+            if not key or key in seen:
+                continue
+            grams = shingles(key)
+            if any(similarity(grams, other) >= threshold for other in kept):
+                continue
+            seen.add(key)
+            kept.append(grams)
+            merged.append(item.strip())
+    return merged
+
+
+class NewsAggregator:
+    """并发查询多个新闻源
+
+    - 按历史延迟与成功率排序, 每次并发查询最优的 fanout 个来源, 都失败时再查询其余来源
+    - first: 返回第一个当天的有效结果; 都不是当天时返回日期最新的结果
+    - merge: 等待所有来源, 以日期最新的来源中配置顺序最靠前的为主, 按配置顺序合并其他同日来源的条目并去重
+    - 每个来源有独立的熔断器, 连续失败的来源在冷却期内不再请求
+    """
+
+    def __init__(
+        self,
+        http: HttpClient,
+        sources: List[NewsSource],
+        strategy: str = STRATEGY_FIRST,
+        fanout: int = 3,
+        threshold: float = DEFAULT_SIMILARITY,
+        logger=None,
+    ):
+        self.http = http
+        self.sources = sources
+        self.strategy = STRATEGY_MERGE if strategy == STRATEGY_MERGE else STRATEGY_FIRST
+        self.fanout = max(1, int(fanout))
+        self.threshold = threshold
+        self.logger = logger
+        self.last_source = ""
+
+    def ranked(self) -> List[NewsSource]:
+        """按优先级排列的可用来源 (熔断中的来源除外)"""
+        available = [s for s in self.sources if s.breaker.retry_after() <= 0]
+        return sorted(available, key=lambda source: source.stats.score())
+
+    async def query(self, source: NewsSource) -> Dict[str, Any]:
+        """查询单个来源并记录统计"""
+        started = time.monotonic()
+
+        async def request():
+            payload, _ = await self.http.get_json(source.url)
+            return validate_news(payload)
+
+        try:
+            data = await source.breaker.call(request)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            source.stats.record_failure(repr(e))
+            if self.logger:
+                self.logger.warning(f"[每日新闻] 新闻源 {source.name} 请求失败: {e!r}")
+            raise
+        source.stats.record_success(time.monotonic() - started, data["date"])
+        return data
+
+    async def fetch(self, today: Optional[str] = None) -> Dict[str, Any]:
+        """获取新闻数据
+
+        :param today: 期望的新闻日期 (YYYY-MM-DD), 应由调用方按推送时区传入; 未传入时使用本机日期
+        :raises SourceError: 所有来源都不可用
+        """
+        today = today or datetime.date.today().isoformat()
+        ranked = self.ranked()
+        if not ranked:
+            raise CircuitOpenError(min(s.breaker.retry_after() for s in self.sources))
+        batches = [ranked[: self.fanout], ranked[self.fanout :]]
+        errors: List[str] = []
+        for batch in batches:
+            if not batch:
+                continue
+            if self.strategy == STRATEGY_MERGE:
+                result = await self._merge(batch, errors)
+            else:
+                result = await self._first(batch, today, errors)
+            if result is not None:
+                return result
+        raise SourceError(f"所有新闻源都不可用: {'; '.join(errors)}")
+
+    async def _first(
+        self, sources: List[NewsSource], today: str, errors: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        async def tagged(source: NewsSource) -> Tuple[NewsSource, Dict[str, Any]]:
+            return source, await self.query(source)
+
+        tasks = [asyncio.ensure_future(tagged(source)) for source in sources]
+        best: Optional[Tuple[NewsSource, Dict[str, Any]]] = None
+        try:
+            for future in asyncio.as_completed(tasks):
+                try:
+                    source, data = await future
+                except Exception as e:
+                    errors.append(repr(e))
+                    continue
+                if data["date"] == today:
+                    return self._chosen(source, data)
+                if best is None or data["date"] > best[1]["date"]:
+                    best = (source, data)
+        finally:
+            # 已有结果时不再等待其余来源, 被取消的请求不计入统计
+            for task in tasks:
+                task.cancel()
+        return self._chosen(*best) if best else None
+
+    async def _merge(
+        self, sources: List[NewsSource], errors: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        results = await asyncio.gather(
+            *(self.query(source) for source in sources), return_exceptions=True
+        )
+        valid = []
+        for source, result in zip(sources, results):
+            if isinstance(result, BaseException):
+                errors.append(repr(result))
+            else:
+                valid.append((source, result))
+        if not valid:
+            return None
+        newest = max(data["date"] for _, data in valid)
+        # 排名只决定查询哪些来源; 主来源与合并顺序按配置顺序,
+        # 否则排名变化会让同一期新闻的内容 (及哈希) 在每次获取时来回变化
+        order = {id(source): index for index, source in enumerate(self.sources)}
+        same_day = sorted(
+            ((source, data) for source, data in valid if data["date"] == newest),
+            key=lambda item: order.get(id(item[0]), len(order)),
+        )
+        primary_source, primary = same_day[0]
+        merged = dict(primary)
+        merged["news"] = merge_news(
+            [data["news"] for _, data in same_day], self.threshold
+        )
+        for key in ("tip", "image"):
+            if not merged.get(key):
+                merged[key] = next((data[key] for _, data in same_day if data[key]), "")
+        if self.logger and len(same_day) > 1:
+            self.logger.info(
+                f"[每日新闻] 合并 {len(same_day)} 个新闻源的 {newest} 新闻: "
+                f"{sum(len(d['news']) for _, d in same_day)} 条去重后保留 {len(merged['news'])} 条"
+            )
+        return self._chosen(primary_source, merged)
+
+    def _chosen(self, source: NewsSource, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.last_source = source.name
+        if self.logger and len(self.sources) > 1:
+            self.logger.debug(f"[每日新闻] 使用新闻源 {source.name} ({data['date']})")
+        return data
+
+    def status_text(self) -> str:
+        """/news_status 展示用的各来源统计"""
+        lines = []
+        for source in sorted(self.sources, key=lambda s: s.stats.score()):
+            stats = source.stats
+            latency = f"{stats.latency * 1000:.0f}ms" if stats.latency is not None else "-"
+            wait = source.breaker.retry_after()
+            state = f", 熔断中 {wait:.0f}s" if wait > 0 else ""
+            lines.append(
+                f"  {source.name}: 成功 {stats.successes}/{stats.requests}, 延迟 {latency}"
+                + (f", 最新 {stats.last_date}" if stats.last_date else "")
+                + state
+            )
+        return "\n".join(lines)
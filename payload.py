@@ -0,0 +1,110 @@
+import os
+import base64
+from typing import Dict, List, Optional, Tuple
+from astrbot.core.message.message_event_result import MessageChain
+from astrbot.api.message_components import Plain, Image
+from .delivery import platform_of
+
+SEND_MODE_AUTO = "auto"
+SEND_MODE_FILE = "file"
+SEND_MODE_BASE64 = "base64"
+
+# 这些平台的协议端通常与 AstrBot 不在同一环境 (如 NapCat 运行在另一个容器中),
+# 无法读取 AstrBot 本地的文件路径, auto 模式下对它们使用 base64
+REMOTE_FILE_PLATFORMS = {"aiocqhttp", "gewechat"}
+
+
+class PreparedPayload:
+    """一期新闻的待发送消息, 只构建一次, 所有群组复用
+
+    - 图片优先以本地文件路径发送, 避免为每个群组生成一份 base64 字符串
+    - base64 只在需要时编码一次, 只有文件路径时此时才读取图片
+    - 图片消息链按发送方式缓存, 文本消息链全局唯一
+    """
+
+    def __init__(
+        self,
+        image: Optional[bytes],
+        text: str,
+        image_path: Optional[str] = None,
+        send_mode: str = SEND_MODE_AUTO,
+    ):
+        self.image = image
+        self.text = text
+        self.image_path = (
+            image_path if image_path and os.path.isfile(image_path) else None
+        )
+        self.send_mode = send_mode
+        self._base64: Optional[str] = None
+        self._image_chains: Dict[str, MessageChain] = {}
+        self._text_chain: Optional[MessageChain] = None
+
+    @classmethod
+    def from_edition(cls, edition, send_mode: str = SEND_MODE_AUTO) -> "PreparedPayload":
+        return cls(edition.image, edition.text, edition.image_path, send_mode)
+
+    def _transport(self, group_id: str) -> str:
+        if self.image_path is None or self.send_mode == SEND_MODE_BASE64:
+            return SEND_MODE_BASE64
+        if self.send_mode == SEND_MODE_FILE:
+            return SEND_MODE_FILE
+        if platform_of(group_id) in REMOTE_FILE_PLATFORMS:
+            return SEND_MODE_BASE64
+        return SEND_MODE_FILE
+
+    @property
+    def image_base64(self) -> str:
+        if self._base64 is None:
+            image = self.image
+            if image is None:
+                with open(self.image_path, "rb") as f:
+                    image = f.read()
+            self._base64 = base64.b64encode(image).decode("utf-8")
+        return self._base64
+
+    def image_chain(self, group_id: str) -> MessageChain:
+        """获取发送给指定群组的图片消息链"""
+        transport = self._transport(group_id)
+        chain = self._image_chains.get(transport)
+        if chain is None:
+            chain = MessageChain()
+            if transport == SEND_MODE_FILE:
+                chain.chain = [Image.fromFileSystem(self.image_path)]
+            else:
+                chain.chain = [Image.fromBase64(self.image_base64)]
+            self._image_chains[transport] = chain
+        return chain
+
+    @staticmethod
+    def notice_chain(notice: str) -> MessageChain:
+        """获取附加说明 (如更正提示) 的消息链"""
+        chain = MessageChain()
+        chain.chain = [Plain(notice)]
+        return chain
+
+    def parts(
+        self,
+        group_id: str,
+        send_image: bool = True,
+        send_text: bool = False,
+        notice: Optional[str] = None,
+    ) -> List[Tuple[str, MessageChain]]:
+        """按发送顺序列出发送给指定群组的各条消息: 附加说明、图片、文本
+
+        :return: (消息名称, 消息链) 列表
+        """
+        parts = []
+        if notice:
+            parts.append(("notice", self.notice_chain(notice)))
+        if send_image:
+            parts.append(("image", self.image_chain(group_id)))
+        if send_text:
+            parts.append(("text", self.text_chain()))
+        return parts
+
+    def text_chain(self) -> MessageChain:
+        """获取文本消息链"""
+        if self._text_chain is None:
+            self._text_chain = MessageChain()
+            self._text_chain.chain = [Plain(self.text)]
+        return self._text_chain
@@ -0,0 +1,198 @@
+import os
+import datetime
+import textwrap
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image, ImageDraw, ImageFont
+from .config import CURRENT_DIR
+
+# 优化前的原始绘制实现 (除去编码), 仅供基准测试比对输出, 插件运行时不会使用。
+# 请勿修改: 缓存、增量重绘、换行等优化是否改变了输出, 以这里的结果为准。
+
+BASE_IMAGE_DIR = os.path.join(CURRENT_DIR, "assets")
+FONT_NEWS_PATH = os.path.join(BASE_IMAGE_DIR, "微软雅黑.ttf")
+FONT_DATE_PATH = os.path.join(BASE_IMAGE_DIR, "2.ttf")
+TEXT_COLOR = (0, 0, 0)
+
+MARGIN_X = 30
+DATE_YEAR_POS = (855, 600)
+DATE_MD_RIGHT_MARGIN = 38
+DATE_MD_Y = 630
+
+NEWS_START_Y = 690
+NEWS_LINE_SPACING = 8
+NEWS_ITEM_SPACING = 15
+TIP_START_Y_BELOW_NEWS = 25
+TIP_MAX_Y = 1860
+TIP_LINE_SPACING = 6
+
+
+def reference_fonts() -> Tuple[ImageFont.FreeTypeFont, ...]:
+    """原始实现使用的字体: (新闻, 日期, 微语)"""
+    return (
+        ImageFont.truetype(FONT_NEWS_PATH, 27),
+        ImageFont.truetype(FONT_DATE_PATH, 20),
+        ImageFont.truetype(FONT_NEWS_PATH, 23),
+    )
+
+
+def wrap_text_pixel(
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    max_width: int,
+    line_spacing: int,
+) -> Tuple[str, int]:
+    """
+    根据像素宽度智能换行文本
+    :return: (换行后的文本字符串, 文本块的总高度)
+    """
+    lines = []
+    initial_words = []
+    for paragraph in text.split("\n"):
+        words_in_paragraph = []
+        current_word = ""
+        for char in paragraph:
+            if "\u4e00" <= char <= "\u9fff":
+                if current_word:
+                    words_in_paragraph.append(current_word)
+                words_in_paragraph.append(char)
+                current_word = ""
+            else:
+                current_word += char
+        if current_word:
+            words_in_paragraph.append(current_word)
+
+        processed_words = []
+        for word in words_in_paragraph:
+            if len(word) > 10 and not ("\u4e00" <= word[0] <= "\u9fff"):
+                estimated_char_width = font.size * 0.6
+                wrap_width_chars = max(1, int(max_width / estimated_char_width))
+                processed_words.extend(
+                    textwrap.wrap(
+                        word,
+                        width=wrap_width_chars,
+                        break_long_words=True,
+                        replace_whitespace=False,
+                    )
+                )
+            else:
+                processed_words.append(word)
+
+        initial_words.extend(processed_words)
+        initial_words.append("\n")
+
+    initial_words.pop()
+
+    current_line = ""
+    for word in initial_words:
+        if word == "\n":
+            lines.append(current_line)
+            current_line = ""
+            continue
+
+        separator = (
+            " "
+            if current_line
+            and not ("\u4e00" <= word[0] <= "\u9fff")
+            and not ("\u4e00" <= current_line[-1] <= "\u9fff")
+            else ""
+        )
+        test_line = current_line + separator + word
+        text_width = font.getlength(test_line)
+
+        if text_width <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+            text_width = font.getlength(current_line)
+
+            while text_width > max_width and len(current_line) > 1:
+                current_line = current_line[:-1]
+                text_width = font.getlength(current_line)
+
+    if current_line:
+        lines.append(current_line)
+
+    final_text = "\n".join(lines)
+    if not final_text:
+        return "", 0
+
+    bbox_multi = draw.multiline_textbbox(
+        (0, 0), final_text, font=font, spacing=line_spacing
+    )
+    actual_height = bbox_multi[3] - bbox_multi[1]
+
+    return final_text, actual_height
+
+
+def render_reference(news_api_data: Dict[str, Any]) -> Tuple[Optional[Image.Image], bool]:
+    """按原始实现绘制新闻图片 (不编码)
+
+    :return: (绘制好的 RGB 图片, 内容是否超出 TIP_MAX_Y); 缺少数据或底图时图片为 None
+    """
+    date_str = news_api_data.get("date")
+    news_list = news_api_data.get("news", [])
+    tip = news_api_data.get("tip", "")
+    if not date_str or not news_list:
+        return None, False
+
+    news_date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
+    base_image_path = os.path.join(BASE_IMAGE_DIR, f"60s_{news_date.strftime('%a')}.jpg")
+    if not os.path.exists(base_image_path):
+        base_image_path = os.path.join(BASE_IMAGE_DIR, "60s_default.jpg")
+        if not os.path.exists(base_image_path):
+            return None, False
+
+    image = Image.open(base_image_path).convert("RGB")
+    width, _ = image.size
+    draw = ImageDraw.Draw(image)
+    font_news, font_date, font_quote = reference_fonts()
+
+    draw.text(DATE_YEAR_POS, news_date.strftime("%Y年"), fill=TEXT_COLOR, font=font_date)
+    month_day_str = news_date.strftime("%m月") + news_date.strftime("%d日")
+    month_day_bbox = draw.textbbox((0, 0), month_day_str, font=font_date)
+    month_day_x = width - (month_day_bbox[2] - month_day_bbox[0]) - DATE_MD_RIGHT_MARGIN
+    draw.text((month_day_x, DATE_MD_Y), month_day_str, fill=TEXT_COLOR, font=font_date)
+
+    max_width = width - 2 * MARGIN_X
+    current_y = NEWS_START_Y
+    overflow = False
+    for i, item in enumerate(news_list):
+        wrapped_item, _ = wrap_text_pixel(
+            draw, f"{i + 1}. {item.strip()}", font_news, max_width, NEWS_LINE_SPACING
+        )
+        if not wrapped_item:
+            continue
+        draw.text(
+            (MARGIN_X, current_y),
+            wrapped_item,
+            fill=TEXT_COLOR,
+            font=font_news,
+            spacing=NEWS_LINE_SPACING,
+        )
+        item_bbox = draw.multiline_textbbox(
+            (MARGIN_X, current_y), wrapped_item, font=font_news, spacing=NEWS_LINE_SPACING
+        )
+        current_y += item_bbox[3] - item_bbox[1] + NEWS_ITEM_SPACING
+        overflow = overflow or current_y > TIP_MAX_Y
+
+    if tip:
+        wrapped_tip, _ = wrap_text_pixel(
+            draw, f"【微语】{tip.strip()}", font_quote, max_width, TIP_LINE_SPACING
+        )
+        tip_start_y = current_y - NEWS_ITEM_SPACING + TIP_START_Y_BELOW_NEWS
+        tip_bbox = draw.multiline_textbbox(
+            (MARGIN_X, tip_start_y), wrapped_tip, font=font_quote, spacing=TIP_LINE_SPACING
+        )
+        overflow = overflow or tip_bbox[3] > TIP_MAX_Y
+        if tip_start_y < TIP_MAX_Y:
+            draw.text(
+                (MARGIN_X, tip_start_y),
+                wrapped_tip,
+                fill=TEXT_COLOR,
+                font=font_quote,
+                spacing=TIP_LINE_SPACING,
+            )
+    return image, overflow
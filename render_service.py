@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from .image_encoder import EncoderSettings
+
+if TYPE_CHECKING:
+    from .batch_render import RenderJob, RenderResult
+
+# 绘制相关模块 (Pillow/字体/底图) 在第一次渲染或后台预热时才导入, 插件启动与重载不必等待
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+RENDER_LOGGER = "astrbot_plugin_daily_news.render"
+
+
+def _render_in_process(
+    news_data: Dict[str, Any], settings: EncoderSettings, logger=None
+) -> Tuple[Optional[bytes], Dict[str, float]]:
+    """渲染池中的渲染入口 (插件 logger 无法跨进程传递, 进程池中使用标准 logging)"""
+    from .news_image_generator import render_news_image_timed
+
+    return render_news_image_timed(
+        news_data, logger or logging.getLogger(RENDER_LOGGER), settings
+    )
+
+
+def _warm_up_worker(logger=None) -> float:
+    """在渲染池中导入绘制模块并预先加载字体与底图, 返回耗时 (秒)"""
+    started = time.perf_counter()
+    from .news_image_generator import warm_up_assets
+
+    warm_up_assets(logger or logging.getLogger(RENDER_LOGGER))
+    return time.perf_counter() - started
+
+
+def _render_job(job: "RenderJob") -> "RenderResult":
+    from .batch_render import render_job
+
+    return render_job(job)
+
+
+class RenderService:
+    """本地新闻图片渲染服务
+
+    将同步的 Pillow 绘制工作放到线程池或进程池中执行, 避免阻塞 AstrBot 事件循环,
+    并通过信号量限制同时进行的渲染数量, 所有调用方共享同一份工作容量。
+    """
+
+    def __init__(
+        self,
+        logger,
+        executor_type: str = EXECUTOR_THREAD,
+        max_workers: int = 2,
+        max_concurrency: int = 2,
+        encoder: Optional[EncoderSettings] = None,
+    ):
+        self.logger = logger
+        self.encoder = encoder or EncoderSettings()
+        self.executor_type = (
+            EXECUTOR_PROCESS if executor_type == EXECUTOR_PROCESS else EXECUTOR_THREAD
+        )
+        self.max_workers = max(1, int(max_workers))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == EXECUTOR_PROCESS:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="daily_news_render"
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 信号量需要在事件循环内创建
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func, *args) -> Any:
+        """在渲染池中执行任意同步函数, 受并发上限约束"""
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore():
+            try:
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            except BrokenProcessPool:
+                # 工作进程意外退出, 重建进程池后重试一次
+                self.logger.warning("[图片渲染] 渲染进程池已损坏, 正在重建")
+                self._shutdown_executor()
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+
+    async def render_news_image(self, news_data: Dict[str, Any]) -> Optional[bytes]:
+        """异步渲染新闻图片
+
+        :param news_data: 新闻数据
+        :return: 按 encoder 编码的图片字节, 失败时返回 None
+        :rtype: bytes
+        """
+        return (await self.render_news_image_timed(news_data))[0]
+
+    async def render_news_image_timed(
+        self, news_data: Dict[str, Any]
+    ) -> Tuple[Optional[bytes], Dict[str, float]]:
+        """异步渲染新闻图片, 同时返回工作线程/进程中测得的绘制与编码耗时"""
+        if self.executor_type == EXECUTOR_PROCESS:
+            return await self.run(_render_in_process, news_data, self.encoder)
+        return await self.run(_render_in_process, news_data, self.encoder, self.logger)
+
+    async def warm_up(self) -> float:
+        """在渲染池中预热绘制模块、字体与底图, 使第一次推送无需等待加载
+
+        进程池只会预热其中一个工作进程, 其余进程在第一次渲染时加载。
+
+        :return: 预热耗时 (秒)
+        """
+        if self.executor_type == EXECUTOR_PROCESS:
+            return await self.run(_warm_up_worker)
+        return await self.run(_warm_up_worker, self.logger)
+
+    async def render_batch(
+        self, jobs: Iterable["RenderJob"]
+    ) -> AsyncIterator["RenderResult"]:
+        """批量渲染, 按完成顺序逐个返回结果
+
+        任务在同一个渲染池中执行并受并发上限约束, 工作线程/进程内的字体与底图缓存被所有任务共享。
+        """
+        tasks = [asyncio.ensure_future(self.run(_render_job, job)) for job in jobs]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _shutdown_executor(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """关闭渲染池"""
+        self._shutdown_executor()
@@ -0,0 +1,273 @@
+import asyncio
+import datetime
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # pragma: no cover - Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+
+@dataclass(frozen=True)
+class ScheduleSlot:
+    """一个每日推送时刻 (某时区下的 时:分)"""
+
+    hour: int
+    minute: int
+    tz_name: str = ""  # 为空表示服务器本地时区
+
+    @property
+    def label(self) -> str:
+        suffix = f" ({self.tz_name})" if self.tz_name else ""
+        return f"{self.hour:02d}:{self.minute:02d}{suffix}"
+
+
+def parse_push_time(value: str) -> Tuple[int, int]:
+    """解析 HH:MM 格式的推送时间
+
+    :raises ValueError: 格式不正确
+    """
+    hour, minute = map(int, str(value).strip().split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"推送时间超出范围: {value}")
+    return hour, minute
+
+
+def parse_group_schedule(entry: str) -> Tuple[str, List[Tuple[int, int]], str]:
+    """解析单个群组的推送时间覆盖配置
+
+    格式为 "群组标识符|时间1,时间2|时区", 时区可省略, 如:
+    "telegram:GroupMessage:123|09:00,21:00|Europe/Berlin"
+
+    :raises ValueError: 格式不正确
+    """
+    parts = [part.strip() for part in str(entry).split("|")]
+    if len(parts) < 2 or not parts[0]:
+        raise ValueError(f"群组推送配置格式错误: {entry}")
+    times = [
+        parse_push_time(value)
+        for value in parts[1].replace("，", ",").split(",")
+        if value.strip()
+    ]
+    tz_name = parts[2] if len(parts) > 2 else ""
+    return parts[0], times, tz_name
+
+
+@dataclass
+class FireBatch:
+    """同一时刻 (批处理窗口内) 触发的推送, 只需获取和渲染一次"""
+
+    fire_at: float  # UTC 时间戳
+    groups: Set[str] = field(default_factory=set)
+    slots: List[ScheduleSlot] = field(default_factory=list)
+
+    @property
+    def local_date(self) -> str:
+        """首个触发时刻在其所属时区中的日期, 用于判断新闻是否为当天"""
+        return local_date(self.fire_at, self.slots[0].tz_name if self.slots else "")
+
+
+def _zone(tz_name: str):
+    return ZoneInfo(tz_name) if tz_name and ZoneInfo is not None else None
+
+
+def local_date(timestamp: float, tz_name: str = "") -> str:
+    """时间戳在指定时区 (为空时为服务器本地时区) 中的日期 (YYYY-MM-DD)"""
+    return datetime.datetime.fromtimestamp(timestamp, _zone(tz_name)).date().isoformat()
+
+
+class PushScheduler:
+    """基于最小堆的推送调度器
+
+    - 启动时解析所有推送时间, 预先计算每个时刻的下一次触发时间放入最小堆
+    - 支持按群组覆盖推送时间与时区, 时区换算由 zoneinfo 处理夏令时
+    - 同一分钟内触发的多个时刻合并为一个批次, 新闻只获取和渲染一次
+    - 分段休眠并检测系统时钟跳变, 跳变后重建堆
+    """
+
+    def __init__(
+        self,
+        slots: Dict[ScheduleSlot, FrozenSet[str]],
+        logger=None,
+        timezone: str = "",
+        batch_window: float = 60,
+        misfire_grace: float = 300,
+        max_sleep_chunk: float = 60,
+        clock_jump_threshold: float = 30,
+    ):
+        self.slots = slots
+        self.logger = logger
+        self.timezone = timezone  # 默认推送时区, 手动推送据此判断新闻是否为当天
+        self.batch_window = batch_window
+        self.misfire_grace = misfire_grace
+        self.max_sleep_chunk = max_sleep_chunk
+        self.clock_jump_threshold = clock_jump_threshold
+        self._heap: List[Tuple[float, int, ScheduleSlot]] = []
+        self._seq = 0
+        # 每个时刻上一次实际触发的时间戳, 时钟回拨后重建堆时据此避免重复推送
+        self._last_fired: Dict[ScheduleSlot, float] = {}
+        self.rebuild(time.time())
+
+    @classmethod
+    def from_config(
+        cls,
+        push_times: Iterable[str],
+        target_groups: Iterable[str],
+        timezone: str = "",
+        group_schedules: Iterable[str] = (),
+        logger=None,
+    ) -> "PushScheduler":
+        """根据插件配置构建调度器, 配置错误的条目会被跳过并记录日志"""
+        timezone = cls._checked_tz(timezone, logger)
+        overrides: Dict[str, List[ScheduleSlot]] = {}
+        for entry in group_schedules or []:
+            try:
+                group_id, times, tz_name = parse_group_schedule(entry)
+            except ValueError as e:
+                if logger:
+                    logger.warning(f"[每日新闻] 忽略无效的群组推送配置: {e}")
+                continue
+            tz_name = cls._checked_tz(tz_name, logger) if tz_name else timezone
+            overrides[group_id] = [ScheduleSlot(h, m, tz_name) for h, m in times]
+
+        default_slots = []
+        for value in push_times:
+            try:
+                hour, minute = parse_push_time(value)
+            except ValueError:
+                if logger:
+                    logger.warning(f"[每日新闻] 忽略无效的推送时间: {value}")
+                continue
+            default_slots.append(ScheduleSlot(hour, minute, timezone))
+
+        slots: Dict[ScheduleSlot, Set[str]] = {}
+        for group_id in target_groups:
+            for slot in overrides.get(group_id, default_slots):
+                slots.setdefault(slot, set()).add(group_id)
+        for group_id, group_slots in overrides.items():
+            for slot in group_slots:
+                slots.setdefault(slot, set()).add(group_id)
+
+        return cls(
+            {slot: frozenset(groups) for slot, groups in slots.items()}, logger, timezone
+        )
+
+    @staticmethod
+    def _checked_tz(tz_name: str, logger) -> str:
+        if not tz_name:
+            return ""
+        try:
+            _zone(tz_name)
+            return tz_name
+        except (ZoneInfoNotFoundError, ValueError):
+            if logger:
+                logger.warning(f"[每日新闻] 未知的时区 {tz_name}, 使用服务器本地时区")
+            return ""
+
+    def today(self) -> str:
+        """默认推送时区中的当前日期"""
+        return local_date(time.time(), self.timezone)
+
+    @property
+    def groups(self) -> Set[str]:
+        """所有参与定时推送的群组"""
+        result: Set[str] = set()
+        for groups in self.slots.values():
+            result.update(groups)
+        return result
+
+    @staticmethod
+    def next_occurrence(slot: ScheduleSlot, after: float) -> float:
+        """计算 slot 在时间戳 after 之后的下一次触发时间 (UTC 时间戳)
+
+        夏令时跳过的时刻顺延到跳变之后, 重复的时刻只在第一次出现时触发。
+        """
+        tz = _zone(slot.tz_name)
+        local_now = datetime.datetime.fromtimestamp(after, tz)
+        day = local_now.date()
+        for _ in range(3):
+            wall = datetime.datetime.combine(day, datetime.time(slot.hour, slot.minute))
+            if tz is None:
+                # naive 本地时间, 由系统时区规则 (含夏令时) 转换
+                timestamp = wall.astimezone().timestamp()
+            else:
+                timestamp = wall.replace(tzinfo=tz, fold=0).timestamp()
+            if timestamp > after:
+                return timestamp
+            day += datetime.timedelta(days=1)
+        raise RuntimeError(f"无法计算 {slot.label} 的下一次触发时间")
+
+    def _push(self, timestamp: float, slot: ScheduleSlot):
+        self._seq += 1
+        heapq.heappush(self._heap, (timestamp, self._seq, slot))
+
+    def rebuild(self, now: float):
+        """从 now 开始重新计算所有时刻的下一次触发时间"""
+        self._heap = []
+        for slot in self.slots:
+            after = max(now, self._last_fired.get(slot, now))
+            self._push(self.next_occurrence(slot, after), slot)
+        self._wall_ref = time.time()
+        self._mono_ref = time.monotonic()
+
+    def peek(self) -> Optional[FireBatch]:
+        """预览下一批次 (不出堆)"""
+        if not self._heap:
+            return None
+        head = self._heap[0][0]
+        batch = FireBatch(fire_at=head)
+        for timestamp, _, slot in sorted(self._heap):
+            if timestamp > head + self.batch_window:
+                break
+            batch.groups.update(self.slots[slot])
+            batch.slots.append(slot)
+        return batch
+
+    def pop_due(self, now: float) -> Optional[FireBatch]:
+        """取出已到时间的批次, 并为其中每个时刻安排下一次触发
+
+        超过容忍时间仍未执行的触发 (例如系统时钟向前跳变) 会被跳过。
+        """
+        batch = None
+        while self._heap and self._heap[0][0] <= now + (
+            self.batch_window if batch is not None else 0
+        ):
+            timestamp, _, slot = heapq.heappop(self._heap)
+            self._push(self.next_occurrence(slot, max(now, timestamp)), slot)
+            if now - timestamp > self.misfire_grace:
+                if self.logger:
+                    self.logger.warning(f"[每日新闻] 错过推送时间 {slot.label}, 已跳过")
+                continue
+            self._last_fired[slot] = timestamp
+            if batch is None:
+                batch = FireBatch(fire_at=timestamp)
+            batch.groups.update(self.slots[slot])
+            batch.slots.append(slot)
+        return batch
+
+    def _clock_jumped(self) -> bool:
+        wall, mono = time.time(), time.monotonic()
+        drift = (wall - self._wall_ref) - (mono - self._mono_ref)
+        self._wall_ref, self._mono_ref = wall, mono
+        return abs(drift) > self.clock_jump_threshold
+
+    async def sleep_until(self, timestamp: float) -> bool:
+        """分段休眠直到指定时间戳
+
+        :return: 正常到达返回 True; 期间检测到系统时钟跳变则重建堆并返回 False
+        """
+        self._clock_jumped()
+        while True:
+            remaining = timestamp - time.time()
+            if remaining <= 0:
+                return True
+            await asyncio.sleep(min(remaining, self.max_sleep_chunk))
+            if self._clock_jumped():
+                if self.logger:
+                    self.logger.warning("[每日新闻] 检测到系统时钟跳变, 重新计算推送计划")
+                self.rebuild(time.time() - self.misfire_grace)
+                return False
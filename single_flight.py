@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """合并相同键的并发调用
+
+    某个键的调用进行中时, 同一键的后续调用不再重复执行, 而是等待同一个结果
+    (包括异常)。调用完成后键即被释放, 之后的调用会重新执行。
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def cancel_all(self, timeout: float = 5) -> List[Hashable]:
+        """取消所有进行中的调用并等待其结束 (如插件卸载时)
+
+        调用由 shield 保护, 等待方被取消后仍会继续执行, 必须在这里显式取消。
+
+        :param timeout: 最多等待的秒数
+        :return: 超时后仍未结束的调用的键
+        """
+        flights = dict(self._inflight)
+        for future in flights.values():
+            future.cancel()
+        if not flights:
+            return []
+        _, pending = await asyncio.wait(flights.values(), timeout=timeout)
+        return [key for key, future in flights.items() if future in pending]
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """执行 factory(), 相同键已有调用进行中时等待其结果
+
+        :param key: 调用的标识
+        :param factory: 返回待执行协程的函数, 只有首个调用方会执行
+        :return: 调用结果
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+
+            def release(done: asyncio.Future):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            future.add_done_callback(release)
+        # 某个等待方被取消时不影响其他等待方共享的调用
+        return await asyncio.shield(future)
@@ -0,0 +1,63 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delivery_journal import DeliveryJob, DeliveryJournal, firing_slot  # noqa: E402
+
+EDITION = SimpleNamespace(date="2025-05-13", content_hash="e05d953817564a61")
+GROUPS = ["aiocqhttp:GroupMessage:1", "aiocqhttp:GroupMessage:2"]
+
+
+def journal(tmp_path):
+    return DeliveryJournal(str(tmp_path / "delivery.db"))
+
+
+def test_scheduled_then_manual_skips_delivered_parts(tmp_path):
+    j = journal(tmp_path)
+    scheduled = DeliveryJob.for_edition(EDITION, True, False, slot=firing_slot(1747095000))
+    assert j.claim(scheduled, GROUPS) == GROUPS
+    for group_id in GROUPS:
+        j.mark_sent(scheduled.job_id, group_id)
+
+    # 手动推送的默认模式 (图片+文本) 与定时推送不同, 任务不同但图片不应再次发送
+    manual = DeliveryJob.for_edition(EDITION, True, True)
+    assert manual.job_id != scheduled.job_id
+    assert j.claim(manual, GROUPS) == GROUPS
+    for group_id in GROUPS:
+        assert j.delivered_parts(EDITION.date, EDITION.content_hash, group_id) == {"image"}
+
+    # 手动推送补发文本后, 再次手动推送时没有需要发送的消息
+    for group_id in GROUPS:
+        j.mark_sent(manual.job_id, group_id)
+    assert j.claim(DeliveryJob.for_edition(EDITION, True, True), GROUPS) == []
+    for group_id in GROUPS:
+        assert j.delivered_parts(EDITION.date, EDITION.content_hash, group_id) == {
+            "image",
+            "text",
+        }
+
+
+def test_interrupted_scheduled_push_counts_sent_parts(tmp_path):
+    j = journal(tmp_path)
+    scheduled = DeliveryJob.for_edition(EDITION, True, True, slot=firing_slot(1747095000))
+    j.claim(scheduled, GROUPS)
+    j.mark_sent(scheduled.job_id, GROUPS[0])
+    j.mark_progress(scheduled.job_id, GROUPS[1], 1)  # 图片已发出, 文本发送前中断
+
+    assert j.delivered_parts(EDITION.date, EDITION.content_hash, GROUPS[0]) == {"image", "text"}
+    assert j.delivered_parts(EDITION.date, EDITION.content_hash, GROUPS[1]) == {"image"}
+    assert j.delivered_parts(EDITION.date, "other-edition", GROUPS[1]) == set()
+
+
+def test_scheduled_firings_are_separate_jobs(tmp_path):
+    j = journal(tmp_path)
+    morning = DeliveryJob.for_edition(EDITION, True, False, slot=firing_slot(1747095000))
+    evening = DeliveryJob.for_edition(
+        EDITION, True, False, slot=firing_slot(1747095000 + 12 * 3600)
+    )
+    j.claim(morning, GROUPS)
+    for group_id in GROUPS:
+        j.mark_sent(morning.job_id, group_id)
+    assert j.claim(evening, GROUPS) == GROUPS
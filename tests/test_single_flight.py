@@ -0,0 +1,34 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from single_flight import SingleFlight  # noqa: E402
+
+
+def test_cancel_all_stops_shielded_call_after_callers_leave():
+    async def scenario():
+        flights = SingleFlight()
+        steps = []
+
+        async def deliver():
+            try:
+                await asyncio.sleep(10)
+                steps.append("sent")
+            except asyncio.CancelledError:
+                steps.append("cancelled")
+                raise
+
+        caller = asyncio.ensure_future(flights.run("deliver", deliver))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0)
+        # 调用方被取消后, 受 shield 保护的调用仍在进行
+        assert flights.in_flight("deliver")
+
+        assert await flights.cancel_all(timeout=1) == []
+        assert steps == ["cancelled"]
+        assert not flights.in_flight("deliver")
+
+    asyncio.run(scenario())
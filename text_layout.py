@@ -0,0 +1,336 @@
+import os
+import textwrap
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Tuple
+from PIL import ImageDraw, ImageFont
+
+Measure = Callable[[str], float]
+
+
+def is_cjk(char: str) -> bool:
+    return "\u4e00" <= char <= "\u9fff"
+
+
+def text_width(draw: ImageDraw.ImageDraw, font: ImageFont.FreeTypeFont, text: str) -> float:
+    """精确测量文本宽度 (包含字距调整)"""
+    try:
+        return font.getlength(text)
+    except AttributeError:
+        bbox = draw.textbbox((0, 0), text, font=font)
+        return bbox[2] - bbox[0]
+
+
+def font_cache_key(font: ImageFont.FreeTypeFont) -> Hashable:
+    """字体的缓存标识: (路径, 文件修改时间, 字号, 排版引擎)
+
+    包含文件修改时间, 同一路径的字体文件被替换后 (AssetStore 重新加载) 不会复用旧字体的宽度与行距。
+    标识在字体对象上只计算一次。
+    """
+    key = getattr(font, "_layout_cache_key", None)
+    if key is None:
+        path = getattr(font, "path", None)
+        try:
+            mtime = os.stat(path).st_mtime_ns if isinstance(path, str) else None
+        except OSError:
+            mtime = None
+        key = (
+            path or id(font),
+            mtime,
+            getattr(font, "size", None),
+            getattr(font, "layout_engine", None),
+        )
+        try:
+            font._layout_cache_key = key
+        except AttributeError:
+            pass
+    return key
+
+
+class GlyphAdvanceCache:
+    """单个 (字体, 字号) 的逐字符步进宽度缓存
+
+    字符宽度之和不包含字距调整, 只用作估算, 断行结果最终由精确测量确认。
+    """
+
+    def __init__(self):
+        self._advances: Dict[str, float] = {}
+
+    def advance(self, char: str, measure: Measure) -> float:
+        width = self._advances.get(char)
+        if width is None:
+            width = measure(char)
+            self._advances[char] = width
+        return width
+
+    def width(self, text: str, measure: Measure) -> float:
+        advances = self._advances
+        total = 0.0
+        for char in text:
+            width = advances.get(char)
+            if width is None:
+                width = self.advance(char, measure)
+            total += width
+        return total
+
+
+_GLYPH_CACHES: Dict[Hashable, GlyphAdvanceCache] = {}
+_GLYPH_CACHES_LOCK = threading.Lock()
+
+
+def get_glyph_cache(font: ImageFont.FreeTypeFont) -> GlyphAdvanceCache:
+    """获取字体对应的字符宽度缓存, 同一字体文件与字号的所有字体对象共享"""
+    key = font_cache_key(font)
+    cache = _GLYPH_CACHES.get(key)
+    if cache is None:
+        with _GLYPH_CACHES_LOCK:
+            cache = _GLYPH_CACHES.setdefault(key, GlyphAdvanceCache())
+    return cache
+
+
+def tokenize(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> List[List[str]]:
+    """将文本切分为可断行的词元, 每个段落一组
+
+    中文字符各自成为一个词元, 连续的非中文字符组成一个词,
+    过长的非中文词按估算宽度预先切开。
+    """
+    paragraphs = []
+    for paragraph in text.split("\n"):
+        words_in_paragraph = []
+        current_word = ""
+        for char in paragraph:
+            if is_cjk(char):
+                if current_word:
+                    words_in_paragraph.append(current_word)
+                words_in_paragraph.append(char)
+                current_word = ""
+            else:
+                current_word += char
+        if current_word:
+            words_in_paragraph.append(current_word)
+
+        processed_words = []
+        for word in words_in_paragraph:
+            if len(word) > 10 and not is_cjk(word[0]):
+                estimated_char_width = font.size * 0.6
+                wrap_width_chars = max(1, int(max_width / estimated_char_width))
+                processed_words.extend(
+                    textwrap.wrap(
+                        word,
+                        width=wrap_width_chars,
+                        break_long_words=True,
+                        replace_whitespace=False,
+                    )
+                )
+            else:
+                processed_words.append(word)
+
+        paragraphs.append(processed_words)
+    return paragraphs
+
+
+class LineBreaker:
+    """基于字符宽度缓存 + 二分查找的贪心断行
+
+    先用缓存的字符宽度前缀和二分出候选断点, 再用精确测量 (含字距调整) 验证并微调,
+    结果与逐词追加、逐次测量整行宽度的朴素贪心算法一致。
+    """
+
+    def __init__(self, draw: ImageDraw.ImageDraw, font: ImageFont.FreeTypeFont, max_width: int):
+        self.max_width = max_width
+        self.glyphs = get_glyph_cache(font)
+        self.measure: Measure = lambda text: text_width(draw, font, text)
+        self.space_width = self.glyphs.advance(" ", self.measure)
+
+    def _fits(self, text: str) -> bool:
+        return self.measure(text) <= self.max_width
+
+    @staticmethod
+    def _needs_space(prev_char: str, word: str) -> bool:
+        return not is_cjk(word[0]) and not is_cjk(prev_char)
+
+    def _join(self, head: str, words: List[str], start: int, end: int) -> str:
+        parts = [head]
+        prev = head[-1] if head else ""
+        for word in words[start:end]:
+            if prev and self._needs_space(prev, word):
+                parts.append(" ")
+            parts.append(word)
+            prev = word[-1]
+        return "".join(parts)
+
+    def _truncate(self, word: str) -> str:
+        """单个词超出最大宽度时保留能放下的最长前缀 (至少一个字符)"""
+        if len(word) <= 1 or self._fits(word):
+            return word
+        # 按估算宽度定位候选长度, 再用精确测量验证
+        prefix = []
+        total = 0.0
+        for char in word:
+            total += self.glyphs.advance(char, self.measure)
+            prefix.append(total)
+        length = max(1, bisect_right(prefix, self.max_width))
+        length = min(length, len(word) - 1)
+        while length > 1 and not self._fits(word[:length]):
+            length -= 1
+        while length + 1 < len(word) and self._fits(word[: length + 1]):
+            length += 1
+        return word[:length]
+
+    def _fit(self, head: str, words: List[str], widths: List[float], start: int) -> int:
+        """返回从 start 开始能追加到 head 之后的词元终点 (不含)"""
+        glyphs = self.glyphs
+        # cumulative[k] 为 head 追加 words[start:start + k] 后的估算宽度
+        cumulative = [glyphs.width(head, self.measure)]
+        prev = head[-1] if head else ""
+        total = cumulative[0]
+        for index in range(start, len(words)):
+            word = words[index]
+            if prev and self._needs_space(prev, word):
+                total += self.space_width
+            total += widths[index]
+            cumulative.append(total)
+            prev = word[-1]
+            if total > self.max_width * 1.25 + self.space_width:
+                break
+
+        end = start + bisect_right(cumulative, self.max_width, lo=1) - 1
+
+        # 精确验证: 估算不含字距调整, 边界附近逐步修正
+        while end > start and not self._fits(self._join(head, words, start, end)):
+            end -= 1
+        while end < len(words) and self._fits(self._join(head, words, start, end + 1)):
+            end += 1
+        return end
+
+    def break_paragraph(self, words: List[str]) -> Tuple[List[str], str]:
+        """对一个段落断行
+
+        :return: (已完成的行, 段落末尾尚未结束的行)
+        """
+        lines: List[str] = []
+        widths = [self.glyphs.width(word, self.measure) for word in words]
+        head = ""
+        start = 0
+        while start < len(words):
+            end = self._fit(head, words, widths, start)
+            if end > start:
+                head = self._join(head, words, start, end)
+            if end == len(words):
+                break
+            # words[end] 放不下, 换行
+            if head:
+                lines.append(head)
+            head = self._truncate(words[end])
+            start = end + 1
+        return lines, head
+
+
+def break_lines(
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    max_width: int,
+) -> List[str]:
+    """根据像素宽度将文本断为多行"""
+    breaker = LineBreaker(draw, font, max_width)
+    paragraphs = tokenize(text, font, max_width)
+    lines: List[str] = []
+    for index, words in enumerate(paragraphs):
+        paragraph_lines, tail = breaker.break_paragraph(words)
+        lines.extend(paragraph_lines)
+        if index < len(paragraphs) - 1:
+            # 显式换行处总是结束当前行 (即使为空行)
+            lines.append(tail)
+        elif tail:
+            lines.append(tail)
+    return lines
+
+
+@dataclass
+class LineBox:
+    """一行文本及其相对文本块原点的位置"""
+
+    text: str
+    y: int  # 绘制时的行起点 (左上锚点) 纵向偏移
+    bbox: Tuple[int, int, int, int]  # 相对文本块原点的墨迹边界
+
+
+@dataclass
+class TextBlockLayout:
+    """一个多行文本块的排版结果, 绘制时无需再次测量"""
+
+    lines: List[LineBox]
+    font: ImageFont.FreeTypeFont
+    spacing: int
+    top: int = 0
+    bottom: int = 0
+    width: int = 0
+    left: int = 0
+
+    @property
+    def height(self) -> int:
+        """与 multiline_textbbox 计算出的高度一致"""
+        return self.bottom - self.top
+
+    @property
+    def text(self) -> str:
+        return "\n".join(line.text for line in self.lines)
+
+    def draw(self, draw: ImageDraw.ImageDraw, xy: Tuple[int, int], fill) -> None:
+        """按排版结果逐行绘制, 与 draw.multiline_text 的输出一致"""
+        x, y = xy
+        for line in self.lines:
+            draw.text((x, y + line.y), line.text, fill=fill, font=self.font)
+
+
+_LINE_PITCHES: Dict[Tuple[Hashable, int], int] = {}
+
+
+def line_pitch(draw: ImageDraw.ImageDraw, font: ImageFont.FreeTypeFont, spacing: int) -> int:
+    """多行文本相邻两行起点的间距, 按当前 Pillow 版本的多行排版规则标定一次后缓存"""
+    key = (font_cache_key(font), spacing)
+    pitch = _LINE_PITCHES.get(key)
+    if pitch is None:
+        single = draw.textbbox((0, 0), "A", font=font)
+        double = draw.multiline_textbbox((0, 0), "A\nA", font=font, spacing=spacing)
+        pitch = double[3] - single[3]
+        _LINE_PITCHES[key] = pitch
+    return pitch
+
+
+def layout_text_block(
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    max_width: int,
+    line_spacing: int,
+) -> TextBlockLayout:
+    """断行并一次性计算每一行的位置与边界
+
+    :return: 文本块排版结果, 文本为空时没有任何行
+    """
+    layout = TextBlockLayout(lines=[], font=font, spacing=line_spacing)
+    lines = break_lines(draw, text, font, max_width)
+    if not "\n".join(lines):
+        return layout
+
+    pitch = line_pitch(draw, font, line_spacing)
+    left = top = right = bottom = None
+    for index, line in enumerate(lines):
+        y = index * pitch
+        bbox = draw.textbbox((0, y), line, font=font)
+        layout.lines.append(LineBox(text=line, y=y, bbox=bbox))
+        line_left, line_top, line_right, line_bottom = bbox
+        if left is None:
+            left, top, right, bottom = bbox
+        else:
+            left, top = min(left, line_left), min(top, line_top)
+            right, bottom = max(right, line_right), max(bottom, line_bottom)
+
+    layout.left = left
+    layout.top = top
+    layout.bottom = bottom
+    layout.width = right - left
+    return layout